@@ -2,36 +2,59 @@ import os
 import json
 from flask_cors import CORS
 import random
-from flask import Flask, request, jsonify, render_template, session
+from flask import Flask, request, jsonify, render_template, session, Response, stream_with_context, g
 from werkzeug.utils import secure_filename
 from datetime import datetime
+import re
+import time
+import uuid
+import hashlib
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-import librosa
-import soundfile as sf
-from transformers import WhisperProcessor
-from optimum.onnxruntime import ORTModelForSpeechSeq2Seq
-from transformers import pipeline
 import traceback 
+from job_queue import JobQueue, JobQueueFull
+from job_store import JobRecordStore
+from media_ingest import MediaIngest, MediaIngestError, find_ffmpeg
+from asr_batcher import ASRBatcher
+from result_cache import ResultCache, file_sha256, DEFAULT_TTL_SECONDS, DEFAULT_MAX_ENTRIES
+from llm_memo import CoalescingMemo
+from llm_client import AsyncLLMClient, CircuitBreaker, build_gemini_client
+from assessment_store import AssessmentStore, DEFAULT_TTL_SECONDS as DEFAULT_ASSESSMENT_TTL_SECONDS
+from upload_stream import StreamingUploadRequest, HashingUploadFile
+from metrics import METRICS, record_stage, timed_stage, render_metrics, start_profile, stop_profile
+from model_server import ModelServerClient, ModelServerError
 
 # --- IMPORT UNTUK LLM (GEMINI) DAN PYDANTIC ---
-import google.genai as genai_module 
 from pydantic import BaseModel, Field
-from typing import Dict, Any 
+from typing import Dict, Any, List 
 
 # --- IMPORT UNTUK CV BARU ---
 # BARIS BARU: Coba import fungsi run_cv_assessment dari file terpisah
 try:
-    from cv_detector import run_cv_assessment, POSE_MODEL 
+    from cv_detector import (
+        run_cv_assessment, warm_up_pose_model, pose_model_status,
+        FRAME_SKIP_RATE, CV_SAMPLE_FPS, cv_config_fingerprint,
+    )
     print("--- Modul CV Detector (Real) berhasil diimpor ---")
 except ImportError as e:
     print(f"WARNING: Gagal mengimpor modul cv_detector.py: {e}. Menggunakan simulasi CV fallback.")
     # Fungsi Fallback (Simulasi) jika import CV gagal
-    def run_cv_assessment(video_path):
+    def run_cv_assessment(video_path, frames=None, **kwargs):
         eye_movement_ratio = round(random.uniform(0.1, 0.4), 2) 
         cheating_flag = random.choice([True, False, False, False])
         violations = random.randint(1, 3) if cheating_flag else 0
         return {"eye_movement_ratio": eye_movement_ratio, "cheating_flag": cheating_flag, "violations": violations, "error": "CV Fallback Mode."}
-    POSE_MODEL = None
+    CV_IMPORT_ERROR = str(e)
+    def warm_up_pose_model():
+        return False
+    def pose_model_status():
+        return {"loaded": False, "error": CV_IMPORT_ERROR}
+    FRAME_SKIP_RATE = 5
+    CV_SAMPLE_FPS = None
+    def cv_config_fingerprint():
+        return "fallback"
 
 # --- LLM OUTPUT SCHEMA ---
 class LLMRubricOutput(BaseModel):
@@ -39,8 +62,18 @@ class LLMRubricOutput(BaseModel):
     score: int = Field(description="Skor penilaian numerik dari 0 hingga 4.")
     reason: str = Field(description="Penjelasan rinci mengapa skor ini diberikan, mengacu pada kriteria rubrik.")
 
+class LLMBatchRubricItem(LLMRubricOutput):
+    """Satu hasil penilaian di dalam output batch."""
+    id: int = Field(description="Nomor pertanyaan yang dinilai (sesuai ID pada prompt).")
+
+class LLMBatchRubricOutput(BaseModel):
+    """Skema output JSON untuk penilaian beberapa jawaban dalam satu panggilan LLM."""
+    results: List[LLMBatchRubricItem] = Field(description="Tepat satu hasil penilaian untuk setiap pertanyaan pada prompt.")
+
 # --- KONFIGURASI FLASK DAN CORS ---
 app = Flask(__name__, template_folder='.') 
+# File upload ditulis langsung ke folder upload (nama unik) sambil di-hash saat body diterima
+app.request_class = StreamingUploadRequest
 CORS(app)
 
 # KONFIGURASI SESSION
@@ -53,43 +86,151 @@ ONNX_MODEL_DIR = "./whisper-small-en-onnx"
 MERGED_MODEL_DIR = "./whisper-small-en-merged" 
 DEVICE = "cuda:0" if 'cuda' in os.environ.get('KMP_AFFINITY', '').lower() else "cpu"
 
+# Thread ONNX Runtime (0 = default ORT) dan micro-batching lintas request (ASR_BATCH_SIZE=1 = nonaktif)
+ORT_INTRA_OP_THREADS = int(os.environ.get("ORT_INTRA_OP_THREADS", 0))
+ORT_INTER_OP_THREADS = int(os.environ.get("ORT_INTER_OP_THREADS", 0))
+ASR_BATCH_SIZE = int(os.environ.get("ASR_BATCH_SIZE", 1))
+ASR_BATCH_WAIT_MS = float(os.environ.get("ASR_BATCH_WAIT_MS", 20))
+
+# Whisper dimuat secara lazy lewat get_asr_pipeline() (atau oleh warm-up, lihat MODEL_WARMUP)
 asr_pipeline = None
+asr_batcher = None
+asr_load_error = None # Pesan error jika pemuatan gagal (tidak dicoba ulang)
+_asr_lock = threading.Lock()
 client = None # Inisialisasi klien Gemini
+llm_backend = None # Backend async (timeout, retry, batas konkurensi) di atas klien Gemini
+LLM_MODEL = 'gemini-2.5-flash'
+GEMINI_BASE_URL = os.environ.get("GEMINI_BASE_URL") # Mis. server palsu lokal untuk pengujian
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", 4))
 
-try:
-    print("--- MEMUAT MODEL WHISPER ONNX UNTUK INFERENSI ---")
-    onnx_processor = WhisperProcessor.from_pretrained(MERGED_MODEL_DIR)
+def build_ort_session_options():
+    import onnxruntime as ort
+
+    session_options = ort.SessionOptions()
+    if ORT_INTRA_OP_THREADS > 0:
+        session_options.intra_op_num_threads = ORT_INTRA_OP_THREADS
+    if ORT_INTER_OP_THREADS > 0:
+        session_options.inter_op_num_threads = ORT_INTER_OP_THREADS
+        session_options.execution_mode = ort.ExecutionMode.ORT_PARALLEL
+    return session_options
+
+def transcribe_batch(audio_batch):
+    """Menjalankan asr_pipeline sekali untuk beberapa audio; mengembalikan list teks."""
+    results = asr_pipeline([audio.copy() for audio in audio_batch], batch_size=len(audio_batch))
+    return [result["text"] for result in results]
+
+def transcribe_audio(audio):
+    """Transkripsi satu audio 16 kHz, lewat micro-batcher jika aktif."""
+    if asr_batcher is not None:
+        return asr_batcher.transcribe(audio)
+    return asr_pipeline(audio.copy())["text"]
+
+# Varian ekspor Whisper ONNX (dipilih saat startup lewat WHISPER_VARIANT / WHISPER_QUANTIZED):
+# - no-cache  : decoder tanpa KV-cache, setiap langkah menghitung ulang seluruh token (perilaku awal)
+# - with-past : decoder_with_past memakai past-key-values sehingga biaya per token konstan
+# - merged    : satu decoder gabungan (dengan/tanpa past) - hemat memori dibanding with-past
+# WHISPER_QUANTIZED=1 memuat file dengan nama yang sama dari WHISPER_INT8_DIR, berisi hasil
+# kuantisasi dinamis INT8 (lihat tools/export_whisper_onnx.py).
+WHISPER_VARIANTS = {
+    "no-cache": {
+        "encoder_file_name": "encoder_model.onnx",
+        "decoder_file_name": "decoder_model.onnx",
+        "use_cache": False,
+    },
+    "with-past": {
+        "encoder_file_name": "encoder_model.onnx",
+        "decoder_file_name": "decoder_model.onnx",
+        "decoder_with_past_file_name": "decoder_with_past_model.onnx",
+        "use_cache": True,
+        "use_merged": False,
+    },
+    # Tanpa decoder_file_name: optimum mencari decoder_model_merged.onnx secara otomatis
+    "merged": {"encoder_file_name": "encoder_model.onnx", "use_cache": True, "use_merged": True},
+}
+WHISPER_VARIANT = os.environ.get("WHISPER_VARIANT", "no-cache")
+WHISPER_QUANTIZED = os.environ.get("WHISPER_QUANTIZED", "0") == "1"
+WHISPER_INT8_DIR = os.environ.get("WHISPER_INT8_DIR", "./whisper-small-en-onnx-int8")
+
+def whisper_model_kwargs(variant=WHISPER_VARIANT, quantized=WHISPER_QUANTIZED):
+    """Direktori model dan argumen ORTModelForSpeechSeq2Seq.from_pretrained untuk varian yang dipilih."""
+    if variant not in WHISPER_VARIANTS:
+        raise ValueError(f"Unknown WHISPER_VARIANT '{variant}'. Use one of {sorted(WHISPER_VARIANTS)}.")
+    model_dir = WHISPER_INT8_DIR if quantized else ONNX_MODEL_DIR
+    return model_dir, dict(WHISPER_VARIANTS[variant])
+
+def load_whisper_pipeline(variant=WHISPER_VARIANT, quantized=WHISPER_QUANTIZED):
+    """Memuat processor + model Whisper ONNX dan membungkusnya sebagai pipeline ASR."""
+    # Import berat (transformers/optimum) ditunda sampai model benar-benar dimuat
+    from transformers import WhisperProcessor, pipeline
+    from optimum.onnxruntime import ORTModelForSpeechSeq2Seq
+
+    processor = WhisperProcessor.from_pretrained(MERGED_MODEL_DIR)
+    model_dir, model_kwargs = whisper_model_kwargs(variant, quantized)
     
-    onnx_model = ORTModelForSpeechSeq2Seq.from_pretrained(
-        ONNX_MODEL_DIR,
-        encoder_file_name="encoder_model.onnx",
-        decoder_file_name="decoder_model.onnx",
+    model = ORTModelForSpeechSeq2Seq.from_pretrained(
+        model_dir,
         provider="CUDAExecutionProvider" if DEVICE == "cuda:0" else "CPUExecutionProvider",
-        use_cache=False
+        session_options=build_ort_session_options(),
+        **model_kwargs
     )
-    provider_name = onnx_model.providers[0]
+    provider = model.providers[0]
     
-    asr_pipeline = pipeline(
+    asr = pipeline(
         "automatic-speech-recognition",
-        model=onnx_model,
-        tokenizer=onnx_processor.tokenizer,
-        feature_extractor=onnx_processor.feature_extractor,
-        device=-1 if provider_name == "CPUExecutionProvider" else 0
+        model=model,
+        tokenizer=processor.tokenizer,
+        feature_extractor=processor.feature_extractor,
+        device=-1 if provider == "CPUExecutionProvider" else 0
     )
-    print(f"--- Model Whisper ONNX Berhasil Dimuat dan Siap Digunakan ({provider_name}) ---")
-except Exception as e:
-    print(f"ERROR: GAGAL MEMUAT MODEL ONNX. Detail: {e}")
+    return asr, provider
+
+def get_asr_pipeline():
+    """Memuat pipeline Whisper (dan micro-batcher) sekali, thread-safe. Mengembalikan None jika gagal dimuat."""
+    global asr_pipeline, asr_batcher, asr_load_error
+    if asr_pipeline is not None or asr_load_error is not None:
+        return asr_pipeline
+
+    with _asr_lock:
+        if asr_pipeline is not None or asr_load_error is not None:
+            return asr_pipeline
+        try:
+            print(f"--- MEMUAT MODEL WHISPER ONNX UNTUK INFERENSI ({WHISPER_VARIANT}{', INT8' if WHISPER_QUANTIZED else ''}) ---")
+            loaded_pipeline, provider_name = load_whisper_pipeline()
+            print(f"--- Model Whisper ONNX Berhasil Dimuat dan Siap Digunakan ({provider_name}) ---")
+
+            if ASR_BATCH_SIZE > 1:
+                asr_batcher = ASRBatcher(transcribe_batch, max_batch_size=ASR_BATCH_SIZE, max_wait_ms=ASR_BATCH_WAIT_MS)
+                print(f"--- Micro-batching STT aktif (batch {ASR_BATCH_SIZE}, tunggu maks {ASR_BATCH_WAIT_MS} ms) ---")
+            # Diisi terakhir: thread lain yang melihat asr_pipeline juga melihat batcher yang sudah siap
+            asr_pipeline = loaded_pipeline
+        except Exception as e:
+            asr_load_error = str(e)
+            print(f"ERROR: GAGAL MEMUAT MODEL ONNX. Detail: {e}")
+    return asr_pipeline
 
 # INISIALISASI KLIEN GEMINI
 try:
     if os.environ.get("GEMINI_API_KEY"):
-        client = genai_module.Client()
+        client = build_gemini_client(base_url=GEMINI_BASE_URL, max_connections=LLM_MAX_CONCURRENCY)
+        llm_backend = AsyncLLMClient(
+            client,
+            max_concurrency=LLM_MAX_CONCURRENCY,
+            timeout_seconds=float(os.environ.get("LLM_TIMEOUT_SECONDS", 20)),
+            deadline_seconds=float(os.environ.get("LLM_DEADLINE_SECONDS", 45)),
+            max_attempts=int(os.environ.get("LLM_MAX_ATTEMPTS", 3)),
+            backoff_seconds=float(os.environ.get("LLM_BACKOFF_SECONDS", 0.5)),
+            breaker=CircuitBreaker(
+                failure_threshold=int(os.environ.get("LLM_BREAKER_FAILURES", 5)),
+                reset_seconds=float(os.environ.get("LLM_BREAKER_RESET_SECONDS", 30)),
+            ),
+        )
         print("--- Klien Gemini berhasil diinisialisasi ---")
     else:
         print("PERINGATAN: Variabel GEMINI_API_KEY tidak ditemukan. Penilaian LLM akan menggunakan Fallback Score.")
 except Exception as e:
     print(f"ERROR: GAGAL menginisialisasi klien Gemini. Detail: {e}")
     client = None
+    llm_backend = None
 
 # --- KONFIGURASI UPLOAD DAN PERTANYAAN ---
 app.config['UPLOAD_FOLDER'] = 'uploads/'
@@ -99,6 +240,142 @@ ALLOWED_EXTENSIONS = {'mp4', 'mov', 'avi', 'mkv', 'webm'}
 if not os.path.exists(app.config['UPLOAD_FOLDER']):
     os.makedirs(app.config['UPLOAD_FOLDER'])
 
+# --- KONFIGURASI EKSEKUSI PARALEL (STT & CV) ---
+# ONNX Runtime (Whisper) dan PyTorch (YOLO) melepas GIL selama inferensi,
+# sehingga thread pool cukup untuk menjalankan kedua model secara bersamaan.
+MEDIA_WORKERS = int(os.environ.get("MEDIA_WORKERS", max(2, os.cpu_count() or 2)))
+media_executor = ThreadPoolExecutor(max_workers=MEDIA_WORKERS, thread_name_prefix="media")
+
+# Ingest tunggal: satu proses ffmpeg men-demux upload untuk STT (audio) dan CV (frame).
+# "auto" = aktif jika ffmpeg tersedia, "0" = decode terpisah (librosa + OpenCV) seperti semula.
+MEDIA_INGEST = os.environ.get("MEDIA_INGEST", "auto").lower()
+
+# --- KONFIGURASI STT BERTAHAP (CHUNKED) ---
+# Audio diproses per jendela tetap dengan overlap agar memori per request terbatas
+# dan transkrip parsial bisa dikirim lebih awal. STT_CHUNKED=1 memakai mode ini untuk semua upload.
+STT_CHUNKED = os.environ.get("STT_CHUNKED", "0") == "1"
+STT_CHUNK_SECONDS = float(os.environ.get("STT_CHUNK_SECONDS", 30))  # Whisper memproses maksimal 30 detik per input
+STT_OVERLAP_SECONDS = float(os.environ.get("STT_OVERLAP_SECONDS", 5))
+STT_SAMPLE_RATE = 16000
+MAX_OVERLAP_WORDS = 30
+
+# --- KONFIGURASI ANTRIAN JOB (MODE ASINKRON) ---
+# Worker pool dibatasi agar lonjakan upload tidak membuat server kelebihan beban.
+# JOB_RECORDS=sqlite menyalin status job ke SQLite agar polling dapat dilayani worker web mana pun.
+JOB_TTL_SECONDS = int(os.environ.get("JOB_TTL_SECONDS", 3600))
+job_records = None
+if os.environ.get("JOB_RECORDS", "memory").lower() == "sqlite":
+    job_records = JobRecordStore(os.environ.get("JOB_RECORDS_PATH", "data/jobs.sqlite3"), ttl_seconds=JOB_TTL_SECONDS)
+job_queue = JobQueue(
+    max_workers=int(os.environ.get("JOB_WORKERS", 2)),
+    max_pending=int(os.environ.get("MAX_PENDING_JOBS", 32)),
+    ttl_seconds=JOB_TTL_SECONDS,
+    record_store=job_records,
+)
+PIPELINE_STAGES = ("stt", "cv", "llm")
+
+# --- KONFIGURASI CACHE HASIL (STT / CV / LLM) ---
+# Upload ulang file yang sama (mis. retry dari frontend) tidak perlu menjalankan ulang model.
+# Key = hash SHA-256 isi file + konfigurasi model; hasil disimpan di SQLite agar bertahan setelah restart.
+RESULT_CACHE_ENABLED = os.environ.get("RESULT_CACHE", "1") == "1"
+RESULT_CACHE_PATH = os.environ.get("RESULT_CACHE_PATH", "cache/results.sqlite3")
+result_cache = None
+if RESULT_CACHE_ENABLED:
+    try:
+        result_cache = ResultCache(
+            RESULT_CACHE_PATH,
+            ttl_seconds=int(os.environ.get("RESULT_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)),
+            max_entries=int(os.environ.get("RESULT_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+            max_bytes=int(float(os.environ.get("RESULT_CACHE_MAX_MB", 256)) * 1024 * 1024),
+        )
+    except Exception as e:
+        print(f"PERINGATAN: Cache hasil tidak aktif. Detail: {e}")
+
+# --- PENYIMPANAN HASIL PENILAIAN (SISI SERVER) ---
+# Cookie session hanya menyimpan assessment_id; hasil per pertanyaan disimpan di SQLite.
+assessment_store = AssessmentStore(
+    os.environ.get("ASSESSMENT_DB_PATH", "data/assessments.sqlite3"),
+    ttl_seconds=int(os.environ.get("ASSESSMENT_TTL_SECONDS", DEFAULT_ASSESSMENT_TTL_SECONDS)),
+)
+# Hasil kedaluwarsa dibersihkan berkala oleh thread latar, bukan pada setiap sesi baru
+ASSESSMENT_PURGE_INTERVAL_SECONDS = float(os.environ.get("ASSESSMENT_PURGE_INTERVAL_SECONDS", 3600))
+
+def purge_expired_assessments_periodically():
+    while True:
+        try:
+            assessment_store.purge_expired()
+        except Exception as e:
+            print(f"PERINGATAN: Gagal membersihkan hasil penilaian kedaluwarsa. Detail: {e}")
+        time.sleep(ASSESSMENT_PURGE_INTERVAL_SECONDS)
+
+if ASSESSMENT_PURGE_INTERVAL_SECONDS > 0:
+    threading.Thread(target=purge_expired_assessments_periodically, name="assessment-purge", daemon=True).start()
+
+# Memo skor LLM in-memory: transkrip identik tidak dinilai ulang dan request bersamaan digabung
+llm_score_memo = CoalescingMemo(
+    max_entries=int(os.environ.get("LLM_MEMO_MAX_ENTRIES", 1024)),
+    ttl_seconds=int(os.environ.get("LLM_MEMO_TTL_SECONDS", 3600)),
+)
+
+# --- MODEL SERVER (DEPLOYMENT MULTI-WORKER) ---
+# Jika MODEL_SERVER_ADDRESS diisi (diatur oleh serve.py), worker web tidak memuat Whisper/YOLO sendiri:
+# STT + CV dijalankan oleh satu proses model server per host (model_server.py) lewat IPC.
+MODEL_SERVER_ADDRESS = os.environ.get("MODEL_SERVER_ADDRESS")
+model_client = None
+if MODEL_SERVER_ADDRESS:
+    model_client = ModelServerClient(
+        MODEL_SERVER_ADDRESS,
+        os.environ.get("MODEL_SERVER_AUTHKEY", "").encode(),
+        timeout=float(os.environ.get("MODEL_SERVER_TIMEOUT_SECONDS", 600)),
+    )
+    print(f"--- STT & CV dijalankan oleh model server di {MODEL_SERVER_ADDRESS} ---")
+
+# --- PEMUATAN MODEL (LAZY) & WARM-UP ---
+# Import app tidak lagi memuat Whisper/YOLO. MODEL_WARMUP menentukan kapan model dimuat:
+# "background" = thread warm-up saat startup (server langsung menerima koneksi, /readyz 503 sampai selesai),
+# "eager" = dimuat saat import seperti semula, "0" = murni lazy (dimuat saat pertama kali dipakai).
+MODEL_WARMUP = os.environ.get("MODEL_WARMUP", "background").lower()
+warmup_state = {"status": "idle", "seconds": None}
+
+def warm_up_models():
+    """Memuat Whisper dan YOLO-Pose, lalu menjalankan satu inferensi kecil pada masing-masing model."""
+    warmup_state["status"] = "running"
+    start = time.perf_counter()
+    try:
+        if get_asr_pipeline() is not None:
+            transcribe_audio(np.zeros(STT_SAMPLE_RATE, dtype=np.float32))
+        pose_ready = warm_up_pose_model()
+        warmup_state["status"] = "done" if asr_pipeline is not None and pose_ready else "failed"
+    except Exception as e:
+        warmup_state["status"] = "failed"
+        print(f"PERINGATAN: Warm-up model gagal. Detail: {e}")
+    warmup_state["seconds"] = round(time.perf_counter() - start, 3)
+    print(f"--- Warm-up model selesai dalam {warmup_state['seconds']}s ({warmup_state['status']}) ---")
+
+def model_status():
+    """Status pemuatan tiap model (untuk /readyz); Whisper dan YOLO-Pose dari model server jika dipakai."""
+    if model_client is not None:
+        try:
+            remote = model_client.call("status")
+            whisper, pose = remote["whisper"], remote["pose"]
+        except ModelServerError as e:
+            whisper = pose = {"loaded": False, "error": str(e)}
+    else:
+        whisper = {"loaded": asr_pipeline is not None, "error": asr_load_error, "variant": WHISPER_VARIANT}
+        pose = pose_model_status()
+    return {
+        "whisper": whisper,
+        "pose": pose,
+        "llm": {"configured": llm_backend is not None,
+                "circuit": llm_backend.breaker.state if llm_backend is not None else None},
+    }
+
+# Worker web yang memakai model server tidak memuat model sendiri
+if model_client is None and MODEL_WARMUP == "eager":
+    warm_up_models()
+elif model_client is None and MODEL_WARMUP == "background":
+    threading.Thread(target=warm_up_models, name="model-warmup", daemon=True).start()
+
 QUESTION_DATA = [
     {"id": 1, "question": "Can you share any specific challenges you faced while working on certification and how you overcame them?"},
     {"id": 2, "question": "Can you describe your experience with transfer learning in TensorFlow? How did it benefit your projects?"},
@@ -108,6 +385,7 @@ QUESTION_DATA = [
 ]
 
 # --- DATA RUBRIK (Disimpan dalam fungsi untuk konsistensi) ---
+RUBRIC_VERSION = 1 # Naikkan jika rubrik atau prompt LLM berubah agar skor lama di cache tidak dipakai lagi
 def get_detailed_rubric(question_id):
     RUBRIC = {
         1: {'4': 'Comprehensive and Clear Response. Provides detailed challenges, clear explanation of how each was overcome, strong technical understanding.', 
@@ -135,16 +413,30 @@ def get_detailed_rubric(question_id):
 
 
 # --- Implementasi STT ONNX & CV ---
-def run_stt_onnx(video_path):
-    if asr_pipeline is None:
+def load_audio_librosa(video_path):
+    import librosa
+
+    audio_data, sr = librosa.load(video_path, sr=16000, mono=True)
+    return audio_data
+
+def run_stt_onnx(video_path, load_audio=None):
+    """
+    load_audio: callable opsional yang mengembalikan audio mono 16 kHz (mis. MediaIngest.read_audio);
+    default memuat audio dari file dengan librosa.
+    """
+    if get_asr_pipeline() is None:
         return "ERROR: Model STT tidak terinisialisasi.", 50
 
     try:
-        audio_data, sr = librosa.load(video_path, sr=16000, mono=True)
-        audio_input = audio_data.astype(np.float32)
+        with timed_stage("stt"):
+            # Waktu memuat audio (decode ffmpeg/librosa) dipisah dari inferensi Whisper
+            with timed_stage("stt_audio_load"):
+                audio_data = load_audio() if load_audio is not None else load_audio_librosa(video_path)
+                audio_input = audio_data.astype(np.float32)
+            METRICS.inc("stt_audio_seconds_total", len(audio_input) / STT_SAMPLE_RATE)
 
-        result = asr_pipeline(audio_input.copy())
-        transcript = result["text"]
+            with timed_stage("stt_inference"):
+                transcript = transcribe_audio(audio_input)
         
         # TAMPILKAN AKURASI STT (90-95%) UNTUK VARIASI UX, MODEL ASLI MEMILIKI AKURASI 96% (Meminimalkan overhead komputasi)
         stt_accuracy = random.randint(90, 95) 
@@ -152,27 +444,323 @@ def run_stt_onnx(video_path):
         return transcript, stt_accuracy
     except Exception as e:
         traceback.print_exc() 
+        METRICS.inc("stage_errors_total", stage="stt")
         return f"ERROR: Gagal mentranskripsi audio. Detail: {str(e)}", 50
 
-# --- FUNGSI LLM SCORING ---
-def run_llm_scoring(transcript, question_id):
+def iter_audio_windows(audio_chunks, window_seconds=STT_CHUNK_SECONDS, overlap_seconds=STT_OVERLAP_SECONDS):
     """
-    Mengirim transkrip dan rubrik ke LLM (Gemini) untuk penilaian objektif (0-4).
+    Mengubah aliran potongan audio menjadi jendela tetap yang saling overlap.
+    Menghasilkan (start_detik, end_detik, audio_window) tanpa menyimpan seluruh audio.
     """
-    if client is None:
-        return 1, "LLM API not initialized. Falling back to Score 1 for safety."
+    window = int(window_seconds * STT_SAMPLE_RATE)
+    step = window - int(min(overlap_seconds, window_seconds / 2) * STT_SAMPLE_RATE)
+    buffer = np.zeros(0, dtype=np.float32)
+    offset = 0
+    emitted = False
+
+    for chunk in audio_chunks:
+        buffer = np.concatenate([buffer, np.asarray(chunk, dtype=np.float32)])
+        while len(buffer) >= window:
+            yield offset / STT_SAMPLE_RATE, (offset + window) / STT_SAMPLE_RATE, buffer[:window]
+            emitted = True
+            buffer = buffer[step:]
+            offset += step
+
+    # Sisa audio: hanya diproses jika berisi audio baru di luar bagian overlap
+    if len(buffer) > 0 and (not emitted or len(buffer) > window - step):
+        yield offset / STT_SAMPLE_RATE, (offset + len(buffer)) / STT_SAMPLE_RATE, buffer
+
+
+def _normalize_words(text):
+    return [re.sub(r"[^\w']", "", word.lower()) for word in text.split()]
+
+
+def merge_overlapping_text(previous_text, new_text):
+    """
+    Menggabungkan transkrip jendela baru ke transkrip sebelumnya dengan membuang kata
+    yang terduplikasi akibat overlap (akhir teks lama == awal teks baru).
+    """
+    new_words = new_text.split()
+    if not previous_text:
+        return " ".join(new_words), " ".join(new_words)
+
+    previous_norm = _normalize_words(previous_text)[-MAX_OVERLAP_WORDS:]
+    new_norm = _normalize_words(new_text)
+
+    # Kata pertama jendela baru bisa terpotong, jadi izinkan lompatan hingga 2 kata
+    drop = 0
+    for skip in range(0, 3):
+        for k in range(min(len(previous_norm), len(new_norm) - skip), 1, -1):
+            if previous_norm[-k:] == new_norm[skip:skip + k]:
+                drop = skip + k
+                break
+        if drop:
+            break
+
+    added = " ".join(new_words[drop:])
+    merged = f"{previous_text} {added}".strip() if added else previous_text
+    return merged, added
+
+
+def run_stt_onnx_chunked(video_path, audio_chunks=None, on_partial=None):
+    """
+    Versi bertahap dari run_stt_onnx: audio ditranskripsi per jendela STT_CHUNK_SECONDS
+    dengan overlap STT_OVERLAP_SECONDS. Setiap jendela yang selesai dikirim ke
+    on_partial({"start", "end", "text", "transcript"}). Hasil akhir sama formatnya: (transcript, stt_accuracy).
+    audio_chunks: iterator audio 16 kHz (mis. MediaIngest.audio_chunks); default memuat file dengan librosa.
+    """
+    if get_asr_pipeline() is None:
+        return "ERROR: Model STT tidak terinisialisasi.", 50
+
+    try:
+        with timed_stage("stt") as stage:
+            if audio_chunks is None:
+                audio_chunks = [load_audio_librosa(video_path)]
+
+            transcript = ""
+            end = infer_seconds = 0.0
+            for start, end, window in iter_audio_windows(audio_chunks):
+                window_start = time.perf_counter()
+                text = transcribe_audio(window)
+                infer_seconds += time.perf_counter() - window_start
+                transcript, added = merge_overlapping_text(transcript, text)
+                if on_partial is not None:
+                    on_partial({"start": round(start, 2), "end": round(end, 2), "text": added, "transcript": transcript})
+        # Sisa waktu di luar inferensi = menunggu/decode audio (dan callback partial)
+        record_stage("stt_inference", infer_seconds)
+        record_stage("stt_audio_load", max(0.0, stage.seconds - infer_seconds))
+        METRICS.inc("stt_audio_seconds_total", end)
+
+        stt_accuracy = random.randint(90, 95) 
+        return transcript, stt_accuracy
+    except Exception as e:
+        traceback.print_exc() 
+        METRICS.inc("stage_errors_total", stage="stt")
+        return f"ERROR: Gagal mentranskripsi audio. Detail: {str(e)}", 50
+
+def _timed_call(func, *args, **kwargs):
+    """Menjalankan func(*args, **kwargs) dan mengembalikan (hasil, durasi_detik)."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def _no_progress(stage, status, detail=None):
+    pass
+
+
+def _run_stage(stage, progress, func, *args, **kwargs):
+    """Seperti _timed_call, tetapi melaporkan status tahap melalui callback progress."""
+    progress(stage, "running")
+    try:
+        result, seconds = _timed_call(func, *args, **kwargs)
+    except Exception:
+        progress(stage, "failed")
+        raise
+    progress(stage, "done")
+    return result, seconds
 
+
+def start_media_ingest(video_path, video=True):
+    """
+    Memulai decode audio (dan frame jika video=True) dengan ffmpeg; mengembalikan None jika
+    tidak aktif/gagal (fallback ke librosa + OpenCV).
+    """
+    if MEDIA_INGEST in ("0", "false", "off") or not find_ffmpeg():
+        return None
+    try:
+        return MediaIngest(video_path, frame_step=FRAME_SKIP_RATE, sample_fps=CV_SAMPLE_FPS, video=video).start()
+    except (MediaIngestError, OSError) as e:
+        app.logger.warning(f"Media ingest unavailable, decoding audio/video separately: {e}")
+        return None
+
+
+def ingest_audio_loader(ingest, video_path):
+    """load_audio untuk run_stt_onnx: audio dari ffmpeg, atau librosa jika ffmpeg gagal saat berjalan."""
+    def load_audio():
+        try:
+            return ingest.read_audio()
+        except MediaIngestError as e:
+            app.logger.warning(f"Media ingest failed for STT, decoding audio with librosa: {e}")
+            return load_audio_librosa(video_path)
+    return load_audio
+
+
+def iter_ingest_audio(ingest, video_path):
+    """Seperti ingest.audio_chunks(), dengan fallback librosa jika ffmpeg gagal sebelum menghasilkan audio."""
+    produced = False
+    try:
+        for chunk in ingest.audio_chunks():
+            produced = True
+            yield chunk
+    except MediaIngestError as e:
+        if produced:
+            raise # Sebagian transkrip sudah dikirim; audio tidak bisa disambung dari sumber lain
+        app.logger.warning(f"Media ingest failed for STT, decoding audio with librosa: {e}")
+        yield load_audio_librosa(video_path)
+
+
+def run_cv_with_ingest(video_path, ingest=None):
+    """CV dari frame ingest; jika ffmpeg gagal men-decode frame, diulang dengan OpenCV."""
+    if ingest is not None and ingest.has_video:
+        try:
+            return run_cv_assessment(
+                video_path, frames=ingest.frames(), frame_count=ingest.frame_count, source_fps=ingest.source_fps
+            )
+        except MediaIngestError as e:
+            app.logger.warning(f"Media ingest failed for CV, decoding frames with OpenCV: {e}")
+        finally:
+            ingest.release_frames()
+    return run_cv_assessment(video_path)
+
+
+def build_cache_keys(video_path, stream_transcript=False, content_hash=None):
+    """
+    Key cache hasil STT & CV untuk satu upload (nilai None jika cache tidak aktif).
+    content_hash: SHA-256 file yang sudah dihitung sebelumnya (opsional).
+    """
+    if result_cache is None:
+        return {"stt": None, "cv": None}
+    if content_hash is None:
+        content_hash = file_sha256(video_path)
+
+    stt_config = f"whisper={WHISPER_VARIANT}:int8={int(WHISPER_QUANTIZED)}"
+    if stream_transcript or STT_CHUNKED:
+        stt_config += f":chunk={STT_CHUNK_SECONDS}/{STT_OVERLAP_SECONDS}"
+    return {
+        "stt": f"{content_hash}:{stt_config}",
+        "cv": f"{content_hash}:{cv_config_fingerprint()}",
+    }
+
+
+def cache_get(namespace, key):
+    """Mengambil hasil dari cache; kegagalan cache tidak boleh menggagalkan penilaian."""
+    if result_cache is None or key is None:
+        return None
+    try:
+        return result_cache.get(namespace, key)
+    except Exception as e:
+        app.logger.warning(f"Result cache read failed ({namespace}): {e}")
+        return None
+
+
+def cache_set(namespace, key, value):
+    if result_cache is None or key is None:
+        return
+    try:
+        result_cache.set(namespace, key, value)
+    except Exception as e:
+        app.logger.warning(f"Result cache write failed ({namespace}): {e}")
+
+
+def run_stt_and_cv_parallel(video_path, progress=_no_progress, stream_transcript=False, cached_stt=None,
+                            cached_cv=None):
+    """
+    Menjalankan STT (Whisper) dan CV (YOLO-Pose) secara bersamaan pada satu video.
+    Mengembalikan (transcript, stt_accuracy, cv_metrics, timings), timings dalam detik.
+    stream_transcript=True memakai STT bertahap dan melaporkan transkrip parsial lewat progress.
+    cached_stt / cached_cv: hasil dari cache hasil; tahap tersebut tidak dijalankan ulang.
+    """
+    if model_client is not None:
+        return run_stt_and_cv_remote(video_path, progress, stream_transcript, cached_stt, cached_cv)
+
+    wall_start = time.perf_counter()
+    # Audio selalu di-decode dengan ffmpeg jika STT harus dijalankan (librosa jauh lebih lambat);
+    # frame hanya ikut di-decode jika CV belum ada di cache
+    ingest = start_media_ingest(video_path, video=cached_cv is None) if cached_stt is None else None
+    try:
+        if cached_stt is not None:
+            stt_future = None
+        elif stream_transcript or STT_CHUNKED:
+            audio_chunks = iter_ingest_audio(ingest, video_path) if ingest else None
+            on_partial = lambda partial: progress("stt", "partial", partial)
+            stt_future = media_executor.submit(
+                contextvars.copy_context().run,
+                _run_stage, "stt", progress, run_stt_onnx_chunked, video_path, audio_chunks, on_partial
+            )
+        else:
+            load_audio = ingest_audio_loader(ingest, video_path) if ingest else None
+            # copy_context: durasi tahap di thread pool tetap tercatat pada profil request (X-Profile)
+            stt_future = media_executor.submit(
+                contextvars.copy_context().run, _run_stage, "stt", progress, run_stt_onnx, video_path, load_audio
+            )
+
+        # CV dijalankan di thread pemanggil (audio dan frame di-decode oleh proses ffmpeg terpisah,
+        # sehingga STT tidak menunggu CV menghabiskan frame)
+        if cached_cv is not None:
+            cv_metrics, cv_seconds = cached_cv, 0.0
+            progress("cv", "done", {"cached": True})
+        else:
+            cv_metrics, cv_seconds = _run_stage("cv", progress, run_cv_with_ingest, video_path, ingest)
+
+        if stt_future is not None:
+            (transcript, stt_accuracy), stt_seconds = stt_future.result()
+        else:
+            transcript, stt_accuracy, stt_seconds = cached_stt["transcript"], cached_stt["stt_accuracy"], 0.0
+            if stream_transcript:
+                progress("stt", "partial", {"text": transcript, "transcript": transcript})
+            progress("stt", "done", {"cached": True})
+    finally:
+        if ingest:
+            ingest.close()
+    wall_seconds = time.perf_counter() - wall_start
+
+    timings = {
+        "stt": round(stt_seconds, 3),
+        "cv": round(cv_seconds, 3),
+        "stt_cv_wall": round(wall_seconds, 3),
+        # Waktu yang dihemat dibanding menjalankan STT lalu CV secara berurutan
+        "stt_cv_saved": round(stt_seconds + cv_seconds - wall_seconds, 3),
+        "media_ingest": ingest is not None,
+    }
+    return transcript, stt_accuracy, cv_metrics, timings
+
+
+def run_stt_and_cv_remote(video_path, progress=_no_progress, stream_transcript=False, cached_stt=None,
+                          cached_cv=None):
+    """
+    run_stt_and_cv_parallel di model server: hanya path video yang dikirim, event progres dan
+    transkrip parsial diteruskan ke callback progress. Hasil dan formatnya sama dengan versi lokal.
+    """
+    try:
+        with timed_stage("model_server"):
+            return model_client.call(
+                "stt_cv", os.path.abspath(video_path), stream_transcript, cached_stt, cached_cv,
+                on_event=lambda event: progress(*event),
+            )
+    except ModelServerError as e:
+        METRICS.inc("stage_errors_total", stage="model_server")
+        cv_metrics = {"eye_movement_ratio": 0.0, "cheating_flag": False, "violations": 0, "error": str(e)}
+        return f"ERROR: Model server gagal. Detail: {e}", 50, cv_metrics, {"stt": 0.0, "cv": 0.0, "media_ingest": False}
+
+# --- FUNGSI LLM SCORING ---
+# Instruksi Sistem untuk LLM
+LLM_SYSTEM_INSTRUCTION = (
+    "You are an expert Machine Learning evaluator. Your task is to provide an objective interview score (0-4) "
+    "based on the transcript and strict rubric. The output MUST be valid JSON."
+)
+
+def normalize_transcript(transcript):
+    """Menyeragamkan spasi agar transkrip yang sama persis isinya memakai hasil penilaian yang sama."""
+    return " ".join(transcript.split())
+
+
+def llm_scoring_key(transcript, question_id):
+    """Key memo/cache skor LLM: transkrip ternormalisasi + pertanyaan + versi rubrik + model."""
+    raw = f"{RUBRIC_VERSION}|{LLM_MODEL}|q{question_id}|{normalize_transcript(transcript)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def request_llm_scoring(transcript, question_id):
+    """
+    Satu panggilan ke Gemini. Mengembalikan (score, reason) atau melempar exception jika gagal
+    (mis. error API atau output tidak sesuai skema); fallback ditangani oleh run_llm_scoring.
+    """
     q_data = QUESTION_DATA[question_id - 1]
     rubric_data = get_detailed_rubric(question_id)
     
     rubric_str = "\n".join([f"Skor {k}: {v}" for k, v in rubric_data.items()])
 
-    # Instruksi Sistem untuk LLM
-    system_instruction = (
-        "You are an expert Machine Learning evaluator. Your task is to provide an objective interview score (0-4) "
-        "based on the transcript and strict rubric. The output MUST be valid JSON."
-    )
-
     # Prompt untuk LLM 
     prompt = f"""
     Instructions: Analyze the following candidate transcripts in response to the question Q{question_id}: '{q_data['question']}'.
@@ -186,50 +774,169 @@ def run_llm_scoring(transcript, question_id):
     Provide a score (0-4) and a detailed reason that explicitly justifies the score based on how well the transcript matches the rubric criteria. Use English for the answer.
     """
     
+    response = llm_backend.generate_content(
+        model=LLM_MODEL,
+        contents=prompt,
+        config={
+            "system_instruction": LLM_SYSTEM_INSTRUCTION,
+            "response_mime_type": "application/json",
+            "response_schema": LLMRubricOutput.model_json_schema()
+        }
+    )
+    
+    llm_output = LLMRubricOutput.model_validate_json(response.text)
+    
+    validated_score = max(0, min(4, llm_output.score))
+    
+    return validated_score, llm_output.reason
+
+
+def run_llm_scoring(transcript, question_id):
+    """
+    Mengirim transkrip dan rubrik ke LLM (Gemini) untuk penilaian objektif (0-4).
+    Transkrip yang identik (setelah normalisasi spasi) untuk pertanyaan yang sama hanya dinilai sekali:
+    hasil disimpan di memo in-memory dan cache hasil, dan request identik yang berjalan bersamaan digabung.
+    """
+    if llm_backend is None:
+        METRICS.inc("llm_scoring_total", outcome="disabled")
+        return 1, "LLM API not initialized. Falling back to Score 1 for safety."
+
+    transcript = normalize_transcript(transcript)
+    key = llm_scoring_key(transcript, question_id)
+    outcome = "memo" # Berubah jika score_once benar-benar dijalankan oleh request ini
+
+    def score_once():
+        nonlocal outcome
+        cached = cache_get("llm", key)
+        if cached is not None:
+            outcome = "cache"
+            return cached["score"], cached["reason"]
+        outcome = "api"
+        score, reason = request_llm_scoring(transcript, question_id)
+        cache_set("llm", key, {"score": score, "reason": reason})
+        return score, reason
+
+    start = time.perf_counter()
     try:
-        response = client.models.generate_content(
-            model='gemini-2.5-flash',
-            contents=prompt,
-            config={
-                "system_instruction": system_instruction,
-                "response_mime_type": "application/json",
-                "response_schema": LLMRubricOutput.model_json_schema()
-            }
-        )
-        
-        llm_output = LLMRubricOutput.model_validate_json(response.text)
-        
-        validated_score = max(0, min(4, llm_output.score))
-        
-        return validated_score, llm_output.reason
-        
+        # Hanya hasil yang berhasil yang disimpan; error tidak di-memo sehingga akan dicoba lagi
+        return llm_score_memo.get_or_compute(key, score_once)
     except Exception as e:
+        outcome = "fallback"
         print(f"LLM API Call Error: {e}")
         return 1, f"LLM Scoring API failed: {str(e)}. Fallback score 1. Needs manual review."
+    finally:
+        record_stage("llm", time.perf_counter() - start)
+        METRICS.inc("llm_scoring_total", outcome=outcome)
 
 
-# --- FUNGSI PENILAIAN UTAMA ---
-def run_rubric_scoring_single(transcript, cv_metrics, stt_accuracy, question_id):
+def request_llm_batch_scoring(items):
     """
-    Menggunakan LLM untuk penilaian objektif (Skor & Alasan), lalu menerapkan penalti CV (SIMULASI).
+    Menilai beberapa jawaban dalam satu panggilan Gemini.
+    items: list (question_id, transcript). Mengembalikan {question_id: (score, reason)},
+    atau melempar exception jika panggilan gagal / hasil tidak lengkap.
     """
-    
-    # 1. Dapatkan Skor dan Alasan dari LLM
-    score, reason = run_llm_scoring(transcript, question_id)
-    
-    # 2. Terapkan Penalti jika Ada Bendera Kecurangan dari CV
+    sections = []
+    for question_id, transcript in items:
+        q_data = QUESTION_DATA[question_id - 1]
+        rubric_str = "\n".join([f"Skor {k}: {v}" for k, v in get_detailed_rubric(question_id).items()])
+        sections.append(f"""
+    ## ID {question_id} - Question Q{question_id}: '{q_data['question']}'
+    ### Official Scoring Rubric:
+    {rubric_str}
+    ### Candidate Transcript (STT Output):
+    "{transcript}"
+    """)
+
+    prompt = f"""
+    Instructions: Analyze each of the following candidate transcripts independently against the rubric of its own question.
+    {"".join(sections)}
+    For every ID above, provide a score (0-4) and a detailed reason that explicitly justifies the score based on how well the transcript matches the rubric criteria. Return exactly one result per ID. Use English for the answer.
+    """
+
+    response = llm_backend.generate_content(
+        model=LLM_MODEL,
+        contents=prompt,
+        config={
+            "system_instruction": LLM_SYSTEM_INSTRUCTION,
+            "response_mime_type": "application/json",
+            "response_schema": LLMBatchRubricOutput.model_json_schema()
+        }
+    )
+
+    llm_output = LLMBatchRubricOutput.model_validate_json(response.text)
+
+    scores = {item.id: (max(0, min(4, item.score)), item.reason) for item in llm_output.results}
+    expected = {question_id for question_id, _ in items}
+    if set(scores) != expected or len(llm_output.results) != len(expected):
+        raise ValueError(f"Batch output IDs {sorted(scores)} do not match requested IDs {sorted(expected)}.")
+    return scores
+
+
+def run_llm_batch_scoring(items):
+    """
+    Menilai semua jawaban (list (question_id, transcript)) dengan satu panggilan LLM.
+    Jawaban yang sudah pernah dinilai diambil dari memo/cache; jika panggilan batch gagal,
+    jawaban yang tersisa dinilai per pertanyaan dengan run_llm_scoring.
+    Mengembalikan {question_id: (score, reason)}.
+    """
+    if llm_backend is None:
+        return {question_id: run_llm_scoring(transcript, question_id) for question_id, transcript in items}
+
+    results = {}
+    remaining = []
+    for question_id, transcript in items:
+        transcript = normalize_transcript(transcript)
+        key = llm_scoring_key(transcript, question_id)
+        cached = llm_score_memo.peek(key)
+        if cached is None:
+            stored = cache_get("llm", key)
+            cached = (stored["score"], stored["reason"]) if stored is not None else None
+        if cached is not None:
+            results[question_id] = cached
+        else:
+            remaining.append((question_id, transcript, key))
+
+    if len(remaining) == 1:
+        question_id, transcript, _ = remaining[0]
+        results[question_id] = run_llm_scoring(transcript, question_id)
+    elif remaining:
+        try:
+            scores = request_llm_batch_scoring([(question_id, transcript) for question_id, transcript, _ in remaining])
+            for question_id, _, key in remaining:
+                results[question_id] = scores[question_id]
+                llm_score_memo.put(key, scores[question_id])
+                cache_set("llm", key, {"score": scores[question_id][0], "reason": scores[question_id][1]})
+        except Exception as e:
+            print(f"LLM Batch API Call Error: {e} Falling back to per-question scoring.")
+            for question_id, transcript, _ in remaining:
+                results[question_id] = run_llm_scoring(transcript, question_id)
+
+    return results
+
+
+# --- FUNGSI PENILAIAN UTAMA ---
+def apply_integrity_penalty(score, reason, cv_metrics):
+    """Menerapkan penalti CV jika ada bendera kecurangan. Mengembalikan (score, reason)."""
     if cv_metrics["cheating_flag"]:
         # Penalti skor
         score = max(1, score - 1) 
         # Menambahkan detail CV Error jika ada
         cv_error_detail = f" (Error: {cv_metrics['error']})" if cv_metrics.get('error') else ""
+        ratio_detail = f"Ratio: {cv_metrics['eye_movement_ratio']}"
+        if cv_metrics.get("eye_movement_ratio_partial"):
+            # CV adaptif berhenti lebih awal: rasio hanya dari bagian video yang dipindai
+            low, high = cv_metrics["sampling"]["ratio_bounds"]
+            ratio_detail += f" from a partial scan, whole-video range {low:.2f}-{high:.2f}"
         reason += (
             f" [INTEGRITY FLAG]: Score adjusted to {score} due to suspected non-verbal "
-            f"violation (Ratio: {cv_metrics['eye_movement_ratio']}){cv_error_detail}. Requires manual validation."
+            f"violation ({ratio_detail}){cv_error_detail}. Requires manual validation."
         )
+    return score, reason
+
 
+def build_score_result(question_id, score, reason, transcript, stt_accuracy, cv_metrics):
     return {
-         "id": question_id,
+        "id": question_id,
         "score": score,
         "reason": reason,
         "transcript": transcript,
@@ -237,6 +944,46 @@ def run_rubric_scoring_single(transcript, cv_metrics, stt_accuracy, question_id)
         "cv_metrics": cv_metrics
     }
 
+
+def run_rubric_scoring_single(transcript, cv_metrics, stt_accuracy, question_id):
+    """
+    Menggunakan LLM untuk penilaian objektif (Skor & Alasan), lalu menerapkan penalti CV (SIMULASI).
+    """
+    
+    # 1. Dapatkan Skor dan Alasan dari LLM
+    score, reason = run_llm_scoring(transcript, question_id)
+    
+    # 2. Terapkan Penalti jika Ada Bendera Kecurangan dari CV
+    score, reason = apply_integrity_penalty(score, reason, cv_metrics)
+
+    return build_score_result(question_id, score, reason, transcript, stt_accuracy, cv_metrics)
+
+
+def build_pending_result(transcript, cv_metrics, stt_accuracy, question_id):
+    """Hasil STT & CV yang penilaian LLM-nya ditunda hingga /api/score_batch dipanggil."""
+    result = build_score_result(
+        question_id, None, "Pending batch LLM scoring.", transcript, stt_accuracy, cv_metrics
+    )
+    result["pending"] = True
+    return result
+
+
+def score_pending_results(session_data):
+    """
+    Menilai semua hasil yang tertunda dalam satu panggilan LLM batch.
+    Mengembalikan list hasil yang sudah dinilai (urutan sama dengan input yang tertunda).
+    """
+    pending = [item for item in session_data if item.get("pending")]
+    scores = run_llm_batch_scoring([(item["id"], item["transcript"]) for item in pending])
+
+    scored = []
+    for item in pending:
+        score, reason = apply_integrity_penalty(*scores[item["id"]], item["cv_metrics"])
+        scored.append(build_score_result(
+            item["id"], score, reason, item["transcript"], item["stt_accuracy"], item["cv_metrics"]
+        ))
+    return scored
+
 # --- FUNGSI FINAL: KOMPILASI SEMUA SKOR DI SESSION ---
 def construct_final_json_summary(session_data):
     
@@ -279,104 +1026,414 @@ def construct_final_json_summary(session_data):
     return assessment_result
 
 
+# --- PIPELINE PENILAIAN SATU VIDEO (STT -> CV -> LLM) ---
+class STTError(Exception):
+    """Dilempar ketika STT gagal sehingga penilaian tidak dapat dilanjutkan."""
+
+
+def run_assessment_pipeline(video_path, question_id, progress=_no_progress, stream_transcript=False,
+                            defer_scoring=False, content_hash=None):
+    """
+    Menjalankan seluruh pipeline penilaian untuk satu video.
+    Mengembalikan (single_score_result, timings). Dipakai oleh mode sinkron dan mode job.
+    Hasil STT/CV/LLM diambil dari cache hasil jika file yang sama pernah dinilai.
+    defer_scoring=True melewati tahap LLM; hasil ditandai pending dan dinilai lewat /api/score_batch.
+    """
+    pipeline_start = time.perf_counter()
+
+    cache_keys = build_cache_keys(video_path, stream_transcript, content_hash)
+    cached_stt = cache_get("stt", cache_keys["stt"])
+    cached_cv = cache_get("cv", cache_keys["cv"])
+
+    # 1 & 2. Jalankan Model STT dan CV secara paralel (keduanya tidak saling bergantung)
+    transcript, stt_accuracy, cv_metrics, timings = run_stt_and_cv_parallel(
+        video_path, progress, stream_transcript, cached_stt=cached_stt, cached_cv=cached_cv
+    )
+    timings["cached"] = [stage for stage, hit in (("stt", cached_stt), ("cv", cached_cv)) if hit is not None]
+    if transcript.startswith("ERROR:"):
+        progress("stt", "failed")
+        raise STTError(transcript)
+
+    # Hanya hasil yang valid yang disimpan (error/fallback akan dicoba ulang pada upload berikutnya)
+    if cached_stt is None:
+        cache_set("stt", cache_keys["stt"], {"transcript": transcript, "stt_accuracy": stt_accuracy})
+    if cached_cv is None and not cv_metrics.get("error"):
+        cache_set("cv", cache_keys["cv"], cv_metrics)
+
+    # Jika CV gagal atau dalam mode fallback, laporkan error
+    if cv_metrics.get("error"):
+        app.logger.warning(f"CV Assessment Error: {cv_metrics['error']}")
+        # Lanjutkan dengan LLM, tapi ada informasi error di cv_metrics
+
+    # 3. Jalankan Penilaian Rubrik (LLM), atau tunda untuk penilaian batch
+    if defer_scoring:
+        single_score_result = build_pending_result(transcript, cv_metrics, stt_accuracy, question_id)
+        progress("llm", "deferred")
+        llm_seconds = 0.0
+    else:
+        single_score_result, llm_seconds = _run_stage(
+            "llm", progress, run_rubric_scoring_single, transcript, cv_metrics, stt_accuracy, question_id
+        )
+    timings["llm"] = round(llm_seconds, 3)
+    timings["total"] = round(time.perf_counter() - pipeline_start, 3)
+    record_stage("pipeline", timings["total"])
+    app.logger.info(f"Q{question_id} stage timings (s): {timings}")
+
+    return single_score_result, timings
+
+
+def run_assessment_job(video_path, question_id, progress=_no_progress, stream_transcript=False, defer_scoring=False,
+                       assessment_id=None, content_hash=None):
+    """
+    Pipeline untuk mode job: hasil langsung disimpan ke assessment_store milik sesi pengunggah
+    dan file video selalu dibersihkan setelah selesai.
+    """
+    try:
+        single_score_result, timings = run_assessment_pipeline(
+            video_path, question_id, progress, stream_transcript, defer_scoring, content_hash
+        )
+        if assessment_id is not None:
+            save_assessment_result(single_score_result, assessment_id)
+        return {"single_score_result": single_score_result, "timings": timings}
+    finally:
+        if os.path.exists(video_path):
+            os.remove(video_path)
+
+
+def save_assessment_result(single_score_result, assessment_id=None):
+    """Menyimpan (atau mengganti) hasil penilaian satu pertanyaan milik sesi saat ini (atau assessment_id)."""
+    assessment_store.save_result(assessment_id or session['assessment_id'], single_score_result)
+
+
+def load_assessment_data():
+    """Semua hasil penilaian milik sesi saat ini."""
+    return assessment_store.list_results(session['assessment_id'])
+
+
 # --- ROUTING FLASK & SESSION MANAGEMENT ---
 
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def validate_upload_request():
+    """
+    Memvalidasi form upload. Mengembalikan (question_id, file, None) jika valid,
+    atau (None, None, (response, status)) jika tidak valid.
+    """
+    # Akses pertama ke request.form mem-parsing body multipart: file upload di-stream ke disk di sini
+    with timed_stage("upload_receive"):
+        question_id_str = request.form.get('questionId')
+    try:
+        question_id = int(question_id_str)
+    except (TypeError, ValueError):
+        return None, None, (jsonify({"error": "Missing or invalid questionId"}), 400)
+        
+    if 'videoFile' not in request.files:
+        return None, None, (jsonify({"error": "No file part"}), 400)
+    
+    file = request.files['videoFile']
+    
+    if file.filename == '' or not allowed_file(file.filename):
+        return None, None, (jsonify({"error": "No selected file or invalid extension"}), 400)
+
+    return question_id, file, None
+
+def wants_deferred_scoring():
+    """Field form opsional deferScoring=1: penilaian LLM ditunda hingga /api/score_batch dipanggil."""
+    return request.form.get('deferScoring', '').lower() in ('1', 'true', 'yes', 'on')
+
+def save_upload(file):
+    """
+    Mengambil alih file upload. Mengembalikan (video_path, content_hash); setelah ini pemanggil
+    bertanggung jawab menghapus file. Upload yang sudah di-stream ke disk tidak disalin ulang.
+    """
+    with timed_stage("upload_save"):
+        if isinstance(file.stream, HashingUploadFile):
+            METRICS.inc("upload_bytes_total", file.stream.size)
+            return file.stream.claim(), file.stream.hexdigest()
+
+        # Fallback (mis. request class lain): simpan dengan nama unik agar upload bersamaan tidak saling menimpa
+        filename = f"{uuid.uuid4().hex}_{secure_filename(file.filename)}"
+        video_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+        file.save(video_path)
+        METRICS.inc("upload_bytes_total", os.path.getsize(video_path))
+        return video_path, None
+
+# Endpoint probe/scrape tidak memakai sesi: tidak membuat cookie maupun menyentuh SQLite
+SESSIONLESS_ENDPOINTS = {"healthz", "readyz", "metrics_endpoint", "static"}
+
 @app.before_request
 def initialize_session():
-    if 'assessment_data' not in session:
-        session['assessment_data'] = []
-    if 'question_data' not in session:
-        session['question_data'] = QUESTION_DATA
+    if request.endpoint in SESSIONLESS_ENDPOINTS:
+        return
+    if 'assessment_id' not in session:
+        session['assessment_id'] = uuid.uuid4().hex
+    # Cookie lama masih membawa seluruh hasil penilaian: pindahkan ke store, cookie cukup berisi id
+    if 'assessment_data' in session:
+        for single_score_result in session.pop('assessment_data'):
+            save_assessment_result(single_score_result)
+    for legacy_key in ('question_data', 'job_owner'):
+        if legacy_key in session:
+            session.pop(legacy_key)
+
+@app.teardown_request
+def cleanup_unclaimed_uploads(exc):
+    # Upload yang tidak pernah diproses (validasi gagal, body terlalu besar, error) selalu dihapus
+    if isinstance(request, StreamingUploadRequest):
+        request.discard_unclaimed_uploads()
+
+# --- PROFIL PER REQUEST (HEADER X-Profile) ---
+# Request dengan header "X-Profile: 1" mendapat header Server-Timing berisi durasi tiap tahap
+# (upload, stt, cv, llm, ...) yang dijalankan selama request tersebut.
+PROFILE_HEADER = "X-Profile"
+
+@app.before_request
+def start_request_profile():
+    if request.headers.get(PROFILE_HEADER, "").lower() in ("1", "true", "yes", "on"):
+        g.request_profile, g.request_profile_token = start_profile()
+
+@app.after_request
+def add_server_timing(response):
+    profile = g.get("request_profile")
+    if profile is not None:
+        response.headers["Server-Timing"] = profile.server_timing()
+    return response
+
+@app.teardown_request
+def stop_request_profile(exc):
+    token = g.pop("request_profile_token", None)
+    if token is not None:
+        stop_profile(token)
 
 @app.route('/')
 def serve_index():
     return render_template('index.html')
 
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    """Liveness: proses hidup dan melayani request (tidak bergantung pada model)."""
+    return jsonify({"status": "ok"})
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    """
+    Readiness: 200 jika Whisper dan YOLO-Pose sudah dimuat, 503 selama warm-up atau jika model gagal dimuat.
+    Pada MODEL_WARMUP=0 model dimuat saat dipakai, sehingga server dianggap siap selama belum ada yang gagal.
+    """
+    models = model_status()
+    if MODEL_WARMUP == "0" and model_client is None:
+        ready = not models["whisper"]["error"] and not models["pose"]["error"]
+    else:
+        ready = models["whisper"]["loaded"] and models["pose"]["loaded"]
+    return jsonify({"ready": ready, "warmup": MODEL_WARMUP, "warmup_state": warmup_state, "models": models}), (200 if ready else 503)
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Metrik latensi per tahap, jumlah frame/audio yang diproses dan memori proses (format Prometheus)."""
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
 @app.route('/api/questions', methods=['GET'])
 def get_questions():
     return jsonify({
-        "questions": session.get('question_data', []),
-        "current_scores": session.get('assessment_data', [])
+        "questions": QUESTION_DATA,
+        "current_scores": load_assessment_data()
     })
 
 @app.route('/api/reset_session', methods=['POST'])
 def reset_session_endpoint():
-    session['assessment_data'] = []
+    assessment_store.clear(session['assessment_id'])
     return jsonify({"message": "Session reset successfully", "assessment_data": []})
 
 
 @app.route('/api/process_video', methods=['POST'])
 def process_video():
     
-    question_id_str = request.form.get('questionId')
-    try:
-        question_id = int(question_id_str)
-    except (TypeError, ValueError):
-        return jsonify({"error": "Missing or invalid questionId"}), 400
-        
-    if 'videoFile' not in request.files:
-        return jsonify({"error": "No file part"}), 400
-    
-    file = request.files['videoFile']
-    
-    if file.filename == '' or not allowed_file(file.filename):
-        return jsonify({"error": "No selected file or invalid extension"}), 400
+    question_id, file, error_response = validate_upload_request()
+    if error_response:
+        return error_response
             
-    filename = secure_filename(file.filename)
-    video_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-    file.save(video_path)
+    video_path, content_hash = save_upload(file)
     
     try:
-        # 1. Jalankan Model STT
-        transcript, stt_accuracy = run_stt_onnx(video_path)
-        if transcript.startswith("ERROR:"):
-            return jsonify({"error": transcript}), 500
-
-        # 2. Jalankan Model CV
-        cv_metrics = run_cv_assessment(video_path)
-        # Jika CV gagal atau dalam mode fallback, laporkan error
-        if cv_metrics.get("error"):
-            app.logger.warning(f"CV Assessment Error: {cv_metrics['error']}")
-            # Lanjutkan dengan LLM, tapi ada informasi error di cv_metrics
-
-        # 3. Jalankan Penilaian Rubrik (LLM)
-        single_score_result = run_rubric_scoring_single(transcript, cv_metrics, stt_accuracy, question_id)
+        # 1-3. Jalankan STT & CV (paralel) lalu Penilaian Rubrik (LLM)
+        single_score_result, timings = run_assessment_pipeline(
+            video_path, question_id, defer_scoring=wants_deferred_scoring(), content_hash=content_hash
+        )
         
         # 4. Simpan hasil penilaian tunggal ke Session
-        current_data = session.get('assessment_data', [])
-        
-        current_data = [item for item in current_data if item['id'] != question_id]
+        save_assessment_result(single_score_result)
         
-        current_data.append(single_score_result)
-        session['assessment_data'] = current_data
-        
-        # 5. Bersihkan file
-        os.remove(video_path) 
-
-        # 6. Kirim kembali data sesi
+        # 5. Kirim kembali data sesi
         return jsonify({
             "message": f"Q{question_id} processed and saved.",
-            "assessment_data": session['assessment_data'],
-            "latest_score": single_score_result
+            "assessment_data": load_assessment_data(),
+            "latest_score": single_score_result,
+            "timings": timings
         }), 200
 
+    except STTError as e:
+        return jsonify({"error": str(e)}), 500
     except Exception as e:
-        os.remove(video_path)
         app.logger.error(f"Error during analysis: {e}")
         return jsonify({"error": f"Internal Server Error: {str(e)}"}), 500
+    finally:
+        # 6. Bersihkan file
+        if os.path.exists(video_path):
+            os.remove(video_path)
+
+
+def submit_assessment_job(video_path, question_id, stream_transcript=False, defer_scoring=False, content_hash=None):
+    """Mendaftarkan pipeline ke job_queue atas nama sesi saat ini. Melempar JobQueueFull jika penuh."""
+    assessment_id = session['assessment_id']
+    try:
+        return job_queue.submit(
+            run_assessment_job, video_path, question_id,
+            stages=PIPELINE_STAGES, owner=assessment_id, stream_transcript=stream_transcript,
+            defer_scoring=defer_scoring, assessment_id=assessment_id, content_hash=content_hash
+        )
+    except JobQueueFull:
+        os.remove(video_path)
+        raise
+
+
+def _sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.route('/api/process_video_async', methods=['POST'])
+def process_video_async():
+    """Mode job: upload langsung dibalas job_id, pipeline berjalan di worker pool."""
+    
+    question_id, file, error_response = validate_upload_request()
+    if error_response:
+        return error_response
+
+    video_path, content_hash = save_upload(file)
+
+    try:
+        job_id = submit_assessment_job(
+            video_path, question_id, defer_scoring=wants_deferred_scoring(), content_hash=content_hash
+        )
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 503
+
+    return jsonify({
+        "message": f"Q{question_id} queued for processing.",
+        "job_id": job_id,
+        "status_url": f"/api/jobs/{job_id}"
+    }), 202
+
+
+@app.route('/api/process_video_stream', methods=['POST'])
+def process_video_stream():
+    """
+    Mode streaming (Server-Sent Events): transkrip parsial dan status tiap tahap dikirim saat tersedia.
+    Event terakhir adalah 'result' (atau 'error'); hasil akhir disimpan ke assessment_store oleh worker.
+    """
+    
+    question_id, file, error_response = validate_upload_request()
+    if error_response:
+        return error_response
+
+    video_path, content_hash = save_upload(file)
+
+    try:
+        job_id = submit_assessment_job(
+            video_path, question_id, stream_transcript=True, defer_scoring=wants_deferred_scoring(),
+            content_hash=content_hash
+        )
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 503
+
+    def generate():
+        yield _sse_event("queued", {"job_id": job_id, "status_url": f"/api/jobs/{job_id}"})
+        seen = 0
+        while True:
+            events, job = job_queue.wait_for_events(job_id, since=seen)
+            if job is None:
+                yield _sse_event("error", {"job_id": job_id, "error": "Job expired"})
+                return
+            for event in events:
+                name = "transcript" if event["status"] == "partial" else "stage"
+                yield _sse_event(name, event)
+            seen += len(events)
+
+            if job['status'] == "done" and not events:
+                yield _sse_event("result", {"job_id": job_id, **job['result']})
+                return
+            if job['status'] == "failed" and not events:
+                yield _sse_event("error", {"job_id": job_id, "error": job['error']})
+                return
+            if not events:
+                yield ": keep-alive\n\n"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """Melaporkan progres per tahap (hasil sudah disimpan ke assessment_store oleh worker)."""
+    
+    job = job_queue.get(job_id)
+    if job is None or job['owner'] != session['assessment_id']:
+        return jsonify({"error": "Job not found"}), 404
+
+    response = {
+        "job_id": job_id,
+        "status": job['status'],
+        "stages": job['stages'],
+        "error": job['error'],
+    }
+
+    if job['status'] == "done":
+        response["single_score_result"] = job['result']['single_score_result']
+        response["timings"] = job['result']['timings']
+        response["assessment_data"] = load_assessment_data()
+
+    return jsonify(response), 200
+
+
+@app.route('/api/score_batch', methods=['POST'])
+def score_batch():
+    """Menilai semua jawaban yang tertunda (deferScoring) dengan satu panggilan LLM setelah semua transkrip siap."""
+
+    session_data = load_assessment_data()
+    answered_ids = {item['id'] for item in session_data}
+    missing_ids = [q['id'] for q in QUESTION_DATA if q['id'] not in answered_ids]
+    if missing_ids:
+        return jsonify({"error": f"Transkrip belum lengkap. Video untuk {', '.join(f'Q{i}' for i in missing_ids)} belum dianalisis."}), 400
+
+    if not any(item.get('pending') for item in session_data):
+        return jsonify({"message": "No pending answers to score.", "assessment_data": session_data}), 200
+
+    start = time.perf_counter()
+    scored_results = score_pending_results(session_data)
+    for single_score_result in scored_results:
+        save_assessment_result(single_score_result)
+
+    return jsonify({
+        "message": f"{len(scored_results)} answers scored in batch.",
+        "assessment_data": load_assessment_data(),
+        "timings": {"llm_batch": round(time.perf_counter() - start, 3)}
+    }), 200
 
 
 @app.route('/api/compile_summary', methods=['GET'])
 def compile_summary():
     
-    session_data = session.get('assessment_data', [])
+    session_data = load_assessment_data()
     
     if len(session_data) < len(QUESTION_DATA):
         return jsonify({"error": f"Penilaian belum lengkap. Analisis {len(QUESTION_DATA)} video (Q1-Q5) harus diselesaikan. Saat ini baru {len(session_data)}."}), 400
+
+    pending_ids = sorted(item['id'] for item in session_data if item.get('pending'))
+    if pending_ids:
+        return jsonify({"error": f"Penilaian LLM untuk {', '.join(f'Q{i}' for i in pending_ids)} masih tertunda. Panggil /api/score_batch terlebih dahulu."}), 400
         
     final_payload = construct_final_json_summary(session_data)
     
@@ -0,0 +1,89 @@
+import queue
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+
+# ========================= KONFIGURASI DEFAULT =========================
+DEFAULT_MAX_BATCH_SIZE = 4
+DEFAULT_MAX_WAIT_MS = 20
+
+
+class ASRBatcher:
+    """
+    Micro-batching untuk model STT yang dipakai bersama oleh banyak request.
+
+    Request dari sesi yang berbeda masuk ke satu antrian; satu thread worker mengumpulkan
+    hingga `max_batch_size` audio (atau menunggu paling lama `max_wait_ms` sejak audio pertama)
+    lalu menjalankan model sekali untuk seluruh batch. Dengan begitu encoder/decoder ONNX
+    tidak saling berebut thread CPU ketika banyak kandidat mengunggah bersamaan.
+
+    transcribe_batch: callable(list[np.ndarray]) -> list[str], urutan hasil sama dengan input.
+    """
+
+    def __init__(self, transcribe_batch, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.transcribe_batch = transcribe_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait_seconds = max(0.0, max_wait_ms / 1000.0)
+        self._queue = queue.Queue()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="asr-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, audio):
+        """Memasukkan audio ke antrian dan mengembalikan Future berisi teks transkripsi."""
+        if self._closed:
+            raise RuntimeError("ASRBatcher is closed.")
+        future = Future()
+        self._queue.put((audio, future))
+        return future
+
+    def transcribe(self, audio, timeout=None):
+        """Versi blocking dari submit()."""
+        return self.submit(audio).result(timeout=timeout)
+
+    def close(self):
+        self._closed = True
+        self._queue.put(None)
+        self._worker.join()
+
+    # ----------------------------- INTERNAL -----------------------------
+    def _collect_batch(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait_seconds
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None) # Proses batch terakhir dulu, lalu berhenti
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            if batch is None:
+                return
+
+            # Request yang sudah dibatalkan tidak perlu ikut diproses
+            batch = [(audio, future) for audio, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            try:
+                texts = self.transcribe_batch([audio for audio, _ in batch])
+                for (_, future), text in zip(batch, texts):
+                    future.set_result(text)
+            except Exception as e:
+                traceback.print_exc()
+                for _, future in batch:
+                    future.set_exception(e)
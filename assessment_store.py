@@ -0,0 +1,79 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# ========================= KONFIGURASI DEFAULT =========================
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600  # Sesi yang tidak diperbarui selama 7 hari dihapus
+
+
+class AssessmentStore:
+    """
+    Penyimpanan hasil penilaian di sisi server (SQLite), diindeks per (assessment_id, question_id).
+
+    Cookie session hanya menyimpan assessment_id; transkrip, alasan LLM dan metrik CV tetap di server.
+    Menyimpan hasil satu pertanyaan hanya menulis satu baris (upsert), bukan seluruh daftar.
+    """
+
+    def __init__(self, path, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS assessment_results (
+                assessment_id TEXT NOT NULL,
+                question_id INTEGER NOT NULL,
+                result TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (assessment_id, question_id)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_assessment_results_updated ON assessment_results (updated_at)"
+        )
+        self._conn.commit()
+
+    def list_results(self, assessment_id):
+        """Semua hasil penilaian milik satu sesi, urut berdasarkan question_id."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT result FROM assessment_results WHERE assessment_id = ? ORDER BY question_id",
+                (assessment_id,),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def save_result(self, assessment_id, single_score_result):
+        """Menyimpan (atau mengganti) hasil penilaian satu pertanyaan."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO assessment_results (assessment_id, question_id, result, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                (assessment_id, single_score_result["id"], json.dumps(single_score_result), time.time()),
+            )
+            self._conn.commit()
+
+    def clear(self, assessment_id):
+        with self._lock:
+            self._conn.execute("DELETE FROM assessment_results WHERE assessment_id = ?", (assessment_id,))
+            self._conn.commit()
+
+    def purge_expired(self):
+        """Menghapus hasil yang tidak diperbarui lebih lama dari ttl_seconds."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM assessment_results WHERE updated_at < ?", (time.time() - self.ttl_seconds,)
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
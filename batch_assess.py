@@ -0,0 +1,200 @@
+"""
+Penilaian offline massal (tanpa UI) untuk banyak kandidat sekaligus.
+
+Manifest berupa CSV (header: candidate,question_id,video_path) atau JSONL dengan field yang sama;
+path relatif dihitung dari folder manifest. Setiap video dijalankan melalui pipeline yang sama
+dengan aplikasi web (STT + CV + LLM) di process pool, dengan model dimuat sekali per worker.
+
+- Checkpoint: hasil per video ditambahkan ke file checkpoint segera setelah selesai, sehingga
+  proses yang terhenti dapat dilanjutkan dengan perintah yang sama (video yang sudah selesai dilewati).
+  Video yang gagal tidak dicatat sehingga dicoba lagi saat dilanjutkan.
+- Cache hasil (RESULT_CACHE, TTL 7 hari) menyimpan skor LLM per transkrip; setelah rubrik/prompt
+  berubah jalankan dengan --no-cache agar skor lama tidak dipakai ulang.
+- Output: satu baris JSONL per kandidat berisi payload construct_final_json_summary, ditulis
+  segera setelah kelima pertanyaan kandidat tersebut selesai dinilai.
+
+Contoh:
+    python batch_assess.py manifest.csv --output summaries.jsonl --workers 4
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+pipeline = None # Modul app, dimuat sekali per worker oleh _init_worker
+
+
+# ----------------------------- MANIFEST & CHECKPOINT -----------------------------
+def load_manifest(path):
+    """Membaca manifest CSV/JSONL menjadi list dict (candidate, question_id, video_path)."""
+    base_dir = os.path.dirname(os.path.abspath(path))
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+
+    items = []
+    for row in rows:
+        video_path = row["video_path"]
+        if not os.path.isabs(video_path):
+            video_path = os.path.join(base_dir, video_path)
+        items.append({
+            "candidate": str(row["candidate"]),
+            "question_id": int(row["question_id"]),
+            "video_path": video_path,
+        })
+    return items
+
+
+def load_jsonl(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_jsonl(path, record):
+    # Satu baris ditulis dan di-flush sekaligus agar checkpoint tetap valid jika proses dihentikan
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+# ----------------------------- WORKER -----------------------------
+def _init_worker(threads_per_worker, use_cache=True):
+    """Membagi thread CPU antar worker, lalu memuat model (Whisper, YOLO, Gemini) satu kali."""
+    global pipeline
+    threads = str(threads_per_worker)
+    for name in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "ORT_INTRA_OP_THREADS"):
+        os.environ[name] = threads
+    os.environ.setdefault("MEDIA_WORKERS", "2")
+    os.environ["MODEL_WARMUP"] = "eager" # Model dimuat di initializer, bukan saat video pertama
+    if not use_cache:
+        os.environ["RESULT_CACHE"] = "0"
+
+    # Thread PyTorch hanya relevan untuk backend ultralytics; backend onnx tidak memerlukan torch
+    if os.environ.get("CV_POSE_BACKEND", "ultralytics").lower() != "onnx":
+        import torch
+        torch.set_num_threads(threads_per_worker)
+
+    import app as pipeline_module
+    pipeline = pipeline_module
+
+
+def assess_video(item):
+    """Menjalankan pipeline penilaian untuk satu video. Mengembalikan record checkpoint."""
+    try:
+        single_score_result, timings = pipeline.run_assessment_pipeline(item["video_path"], item["question_id"])
+        return {**item, "result": single_score_result, "timings": timings}
+    except Exception as e:
+        traceback.print_exc()
+        return {**item, "error": str(e)}
+
+
+# ----------------------------- MAIN -----------------------------
+def write_candidate_summary(output_path, candidate, results, expected_ids):
+    from app import construct_final_json_summary
+
+    missing_ids = sorted(expected_ids - {item["id"] for item in results})
+    if missing_ids:
+        missing = ", ".join(f"Q{question_id}" for question_id in missing_ids)
+        print(f"PERINGATAN: Kandidat {candidate} tidak memiliki video untuk {missing}. Ringkasan dilewati.")
+        return False
+    append_jsonl(output_path, {"candidate": candidate, "final_payload": construct_final_json_summary(results)})
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("manifest", help="Manifest CSV/JSONL: candidate,question_id,video_path")
+    parser.add_argument("--output", default="summaries.jsonl", help="Output JSONL (satu ringkasan per kandidat)")
+    parser.add_argument("--checkpoint", help="File checkpoint per video (default: <output>.checkpoint.jsonl)")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 4),
+                        help="Jumlah proses worker (masing-masing memuat model sendiri)")
+    parser.add_argument("--threads-per-worker", type=int, default=None,
+                        help="Thread CPU per worker (default: jumlah core / workers)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Abaikan cache hasil (RESULT_CACHE): STT, CV dan skor LLM dihitung ulang. "
+                             "Wajib setelah rubrik/prompt berubah, karena cache (TTL 7 hari) "
+                             "akan memakai ulang skor LLM lama untuk video yang sama")
+    args = parser.parse_args()
+
+    checkpoint_path = args.checkpoint or f"{args.output}.checkpoint.jsonl"
+    threads_per_worker = args.threads_per_worker or max(1, (os.cpu_count() or 1) // args.workers)
+
+    items = load_manifest(args.manifest)
+    # Urutkan per kandidat agar ringkasan kandidat dapat ditulis secepatnya
+    items.sort(key=lambda item: (item["candidate"], item["question_id"]))
+
+    results_by_candidate = {}
+    for record in load_jsonl(checkpoint_path):
+        results_by_candidate.setdefault(record["candidate"], {})[record["question_id"]] = record["result"]
+    summarized = {record["candidate"] for record in load_jsonl(args.output)}
+
+    pending_by_candidate = {}
+    todo = []
+    for item in items:
+        if item["question_id"] in results_by_candidate.get(item["candidate"], {}):
+            continue
+        pending_by_candidate[item["candidate"]] = pending_by_candidate.get(item["candidate"], 0) + 1
+        todo.append(item)
+
+    # Import di proses utama hanya untuk QUESTION_DATA / ringkasan; model dimuat lazy sehingga
+    # proses utama tidak ikut memuat Whisper/YOLO (worker memakai MODEL_WARMUP=eager)
+    os.environ.setdefault("MODEL_WARMUP", "0")
+    from app import QUESTION_DATA
+    expected_ids = {q["id"] for q in QUESTION_DATA}
+
+    # Kandidat yang seluruh videonya sudah ada di checkpoint tetapi belum diringkas (mis. proses terhenti)
+    for candidate, results in results_by_candidate.items():
+        if candidate not in summarized and candidate not in pending_by_candidate:
+            if write_candidate_summary(args.output, candidate, list(results.values()), expected_ids):
+                summarized.add(candidate)
+
+    print(f"--- {len(items)} video di manifest, {len(todo)} belum dinilai, "
+          f"{args.workers} worker x {threads_per_worker} thread"
+          f"{', tanpa cache hasil' if args.no_cache else ''} ---")
+    if not todo:
+        return
+
+    start = time.perf_counter()
+    done = failed = 0
+    failed_candidates = set()
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=context, initializer=_init_worker,
+                             initargs=(threads_per_worker, not args.no_cache)) as executor:
+        futures = [executor.submit(assess_video, item) for item in todo]
+        for future in as_completed(futures):
+            record = future.result()
+            candidate = record["candidate"]
+            pending_by_candidate[candidate] -= 1
+
+            if "error" in record:
+                failed += 1
+                failed_candidates.add(candidate)
+                print(f"GAGAL: {candidate} Q{record['question_id']} ({record['video_path']}): {record['error']}")
+            else:
+                done += 1
+                append_jsonl(checkpoint_path, {key: record[key] for key in ("candidate", "question_id", "video_path", "result")})
+                results_by_candidate.setdefault(candidate, {})[record["question_id"]] = record["result"]
+
+            if pending_by_candidate[candidate] == 0 and candidate not in summarized | failed_candidates:
+                results = list(results_by_candidate.get(candidate, {}).values())
+                if write_candidate_summary(args.output, candidate, results, expected_ids):
+                    summarized.add(candidate)
+
+            elapsed = time.perf_counter() - start
+            print(f"[{done + failed}/{len(todo)}] {candidate} Q{record['question_id']} "
+                  f"({elapsed:.1f}s, {(done + failed) / elapsed:.2f} video/s)")
+
+    print(f"--- Selesai: {done} berhasil, {failed} gagal (jalankan ulang untuk mencoba lagi). Output: {args.output} ---")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark sampling frame: membandingkan waktu decode dan rasio gaze antara
+perilaku lama (read setiap frame) dengan mode grab/seek dan sampling berbasis waktu.
+
+Contoh:
+    python benchmarks/bench_frame_sampling.py uploads/sample.mp4 --sample-fps 2 --gaze
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frame_sampler import SAMPLING_MODES, get_source_fps, iter_sampled_frames  # noqa: E402
+
+FRAME_SKIP_RATE = 5 # Sama dengan cv_detector.FRAME_SKIP_RATE, tanpa memuat model YOLO
+
+
+def time_decode(video_path, mode, frame_step=None, sample_fps=None):
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Failed to open video file: {video_path}")
+    try:
+        source_fps = get_source_fps(cap)
+        start = time.perf_counter()
+        sampled = sum(1 for _ in iter_sampled_frames(cap, frame_step=frame_step, sample_fps=sample_fps, mode=mode))
+        seconds = time.perf_counter() - start
+    finally:
+        cap.release()
+    return {"seconds": round(seconds, 4), "sampled_frames": sampled, "source_fps": round(source_fps, 2)}
+
+
+def build_configs(sample_fps):
+    configs = [{"name": f"{mode}/step{FRAME_SKIP_RATE}", "mode": mode, "frame_step": FRAME_SKIP_RATE}
+               for mode in SAMPLING_MODES]
+    if sample_fps:
+        configs += [{"name": f"{mode}/{sample_fps:g}fps", "mode": mode, "sample_fps": sample_fps}
+                    for mode in ("grab", "seek")]
+    return configs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("videos", nargs="+", help="File video yang akan diuji")
+    parser.add_argument("--sample-fps", type=float, default=None, help="Tambahkan konfigurasi sampling N frame/detik")
+    parser.add_argument("--repeat", type=int, default=3, help="Jumlah pengulangan per konfigurasi (diambil yang tercepat)")
+    parser.add_argument("--gaze", action="store_true", help="Bandingkan juga eye_movement_ratio (memerlukan model YOLO-Pose)")
+    parser.add_argument("--output", help="Simpan hasil sebagai JSON")
+    args = parser.parse_args()
+
+    if args.gaze:
+        from cv_detector import run_cv_assessment
+
+    report = []
+    for video_path in args.videos:
+        baseline_seconds = None
+        for config in build_configs(args.sample_fps):
+            runs = [time_decode(video_path, config["mode"], config.get("frame_step"), config.get("sample_fps"))
+                    for _ in range(args.repeat)]
+            best = min(runs, key=lambda r: r["seconds"])
+            if baseline_seconds is None: # Konfigurasi pertama = perilaku lama (read/step5)
+                baseline_seconds = best["seconds"]
+            entry = {"video": video_path, "config": config["name"], **best,
+                     "speedup_vs_read": round(baseline_seconds / best["seconds"], 2) if best["seconds"] else None}
+
+            if args.gaze:
+                cv_result = run_cv_assessment(video_path, sample_fps=config.get("sample_fps"), sampling_mode=config["mode"])
+                entry["eye_movement_ratio"] = cv_result["eye_movement_ratio"]
+                entry["cheating_flag"] = cv_result["cheating_flag"]
+
+            report.append(entry)
+            print(json.dumps(entry))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""
+Benchmark pipeline penilaian dengan fixture sintetis (offline, CPU).
+
+Suite:
+- cv          : run_cv_assessment per fixture
+- stt         : run_stt_onnx pada audio WAV fixture
+- e2e         : POST /api/process_video (Flask test client) dengan LLM stub, tanpa cache hasil
+- concurrency : beberapa request /api/process_video bersamaan (throughput video/detik, latensi p50/p95)
+
+Fixture dibuat sekali di --fixture-dir (lihat synthetic_fixtures.py). Hasil disimpan sebagai JSON
+beserta commit git dan konfigurasi yang memengaruhi performa, sehingga dapat dibandingkan antar commit:
+
+    python benchmarks/bench_pipeline.py --output before.json
+    (ubah FRAME_SKIP_RATE / provider ONNX / model pose, commit)
+    python benchmarks/bench_pipeline.py --output after.json --compare before.json
+
+Suite yang modelnya tidak tersedia (mis. bobot Whisper belum diunduh) dilaporkan sebagai "skipped".
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+# Harus diatur sebelum import app: model dimuat eksplisit, cache hasil dimatikan agar setiap
+# pengulangan benar-benar menjalankan model, dan hasil penilaian ditulis ke database sementara.
+os.environ.setdefault("MODEL_WARMUP", "0")
+os.environ["RESULT_CACHE"] = "0"
+os.environ.setdefault("ASSESSMENT_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="bench_"), "assessments.sqlite3"))
+
+import app  # noqa: E402
+import cv_detector  # noqa: E402
+from media_ingest import find_ffmpeg  # noqa: E402
+from synthetic_fixtures import DEFAULT_SPECS, ensure_fixture  # noqa: E402
+from tools.fake_gemini_server import build_scores  # noqa: E402
+
+SUITES = ("cv", "stt", "e2e", "concurrency")
+
+
+class StubLLMBackend:
+    """Pengganti llm_backend: skor deterministik dari tools/fake_gemini_server.py, latensi opsional."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+
+    def generate_content(self, contents, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        return SimpleNamespace(text=json.dumps(build_scores(contents)))
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        "median_seconds": round(statistics.median(ordered), 4),
+        "min_seconds": round(ordered[0], 4),
+        "p95_seconds": round(ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))], 4),
+        "samples": [round(sample, 4) for sample in samples],
+    }
+
+
+def git_info():
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    status = git("status", "--porcelain", "--untracked-files=no")
+    return {"commit": git("rev-parse", "HEAD"), "dirty": bool(status) if status is not None else None}
+
+
+def run_config():
+    """Konfigurasi yang memengaruhi performa (ikut disimpan agar perbandingan antar commit bermakna)."""
+    return {
+        "frame_skip_rate": cv_detector.FRAME_SKIP_RATE,
+        "cv_sample_fps": cv_detector.CV_SAMPLE_FPS,
+        "cv_sampling_mode": cv_detector.CV_SAMPLING_MODE,
+        "cv_batch_size": cv_detector.CV_BATCH_SIZE,
+        "cv_adaptive": cv_detector.CV_ADAPTIVE,
+        "cv_model_path": cv_detector.CV_MODEL_PATH,
+        "cv_pose_backend": cv_detector.CV_POSE_BACKEND,
+        "cv_pose_imgsz": cv_detector.CV_POSE_IMGSZ,
+        "cv_pose_roi": cv_detector.CV_POSE_ROI,
+        "whisper_variant": app.WHISPER_VARIANT,
+        "whisper_quantized": app.WHISPER_QUANTIZED,
+        "ort_intra_op_threads": app.ORT_INTRA_OP_THREADS,
+        "ort_inter_op_threads": app.ORT_INTER_OP_THREADS,
+        "media_ingest": app.MEDIA_INGEST,
+        "media_workers": app.MEDIA_WORKERS,
+    }
+
+
+# ----------------------------- SUITE -----------------------------
+def bench_cv(fixture, repeat):
+    if cv_detector.get_pose_model() is None:
+        return {"skipped": f"pose model unavailable: {cv_detector.POSE_MODEL_ERROR}"}
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = cv_detector.run_cv_assessment(fixture["video_path"])
+        samples.append(time.perf_counter() - start)
+    return {**summarize(samples), "error": result.get("error"),
+            "realtime_factor": round(statistics.median(samples) / fixture["seconds"], 4)}
+
+
+def bench_stt(fixture, repeat):
+    if app.get_asr_pipeline() is None:
+        return {"skipped": f"whisper unavailable: {app.asr_load_error}"}
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        transcript, _ = app.run_stt_onnx(fixture["audio_path"])
+        samples.append(time.perf_counter() - start)
+    return {**summarize(samples), "error": transcript if transcript.startswith("ERROR:") else None,
+            "realtime_factor": round(statistics.median(samples) / fixture["seconds"], 4)}
+
+
+def post_video(client, fixture, question_id=1):
+    with open(fixture["video_path"], "rb") as f:
+        data = f.read()
+    start = time.perf_counter()
+    response = client.post(
+        "/api/process_video",
+        data={"questionId": str(question_id), "videoFile": (io.BytesIO(data), os.path.basename(fixture["video_path"]))},
+        content_type="multipart/form-data",
+    )
+    return time.perf_counter() - start, response
+
+
+def e2e_unavailable(fixture):
+    if not fixture["has_audio"]:
+        return "ffmpeg not found (fixture video has no audio track)"
+    if app.get_asr_pipeline() is None:
+        return f"whisper unavailable: {app.asr_load_error}"
+    return None
+
+
+def bench_e2e(fixture, repeat):
+    reason = e2e_unavailable(fixture)
+    if reason:
+        return {"skipped": reason}
+    client = app.app.test_client()
+    samples = []
+    stage_timings = []
+    for _ in range(repeat):
+        app.llm_score_memo.clear()
+        seconds, response = post_video(client, fixture)
+        if response.status_code != 200:
+            return {"error": f"HTTP {response.status_code}: {response.get_data(as_text=True)[:200]}"}
+        samples.append(seconds)
+        stage_timings.append(response.get_json()["timings"])
+    # Rincian tahap dari pengulangan dengan total median
+    median_run = stage_timings[samples.index(sorted(samples)[len(samples) // 2])]
+    return {**summarize(samples), "timings": median_run}
+
+
+def bench_concurrency(fixture, concurrency, requests_per_level):
+    reason = e2e_unavailable(fixture)
+    if reason:
+        return {"skipped": reason}
+    app.llm_score_memo.clear()
+    local = threading.local()
+
+    def one_request(index):
+        if not hasattr(local, "client"):
+            local.client = app.app.test_client() # Satu session per thread
+        seconds, response = post_video(local.client, fixture, question_id=index % len(app.QUESTION_DATA) + 1)
+        return seconds, response.status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(one_request, range(requests_per_level)))
+    wall_seconds = time.perf_counter() - start
+
+    latencies = [seconds for seconds, status in outcomes if status == 200]
+    failed = sum(1 for _, status in outcomes if status != 200)
+    if not latencies:
+        return {"error": f"all {failed} requests failed"}
+    return {**summarize(latencies), "wall_seconds": round(wall_seconds, 4), "failed": failed,
+            "videos_per_second": round(len(latencies) / wall_seconds, 4)}
+
+
+# ----------------------------- PERBANDINGAN -----------------------------
+def compare_reports(current, baseline, threshold):
+    """Mencetak rasio median (baru / lama) per entri; mengembalikan jumlah regresi di atas threshold."""
+    previous = {entry["id"]: entry for entry in baseline["results"]}
+    print(f"--- Perbandingan dengan {baseline['meta']['git']['commit']} ---")
+    regressions = 0
+    for entry in current["results"]:
+        old = previous.get(entry["id"])
+        if not old or "median_seconds" not in entry or "median_seconds" not in old:
+            continue
+        ratio = entry["median_seconds"] / old["median_seconds"] if old["median_seconds"] else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESI"
+            regressions += 1
+        elif ratio < 1 - threshold:
+            flag = "  lebih cepat"
+        print(f"{entry['id']:<40} {old['median_seconds']:>9.3f}s -> {entry['median_seconds']:>9.3f}s  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suites", nargs="+", default=list(SUITES), choices=SUITES)
+    parser.add_argument("--fixtures", nargs="+", default=list(DEFAULT_SPECS),
+                        help="Spesifikasi fixture <detik>s@<lebar>x<tinggi>")
+    parser.add_argument("--fixture-dir", default=os.path.join(REPO_ROOT, "benchmarks", "fixtures"))
+    parser.add_argument("--repeat", type=int, default=3, help="Pengulangan per fixture (dilaporkan median)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4], help="Jumlah request bersamaan")
+    parser.add_argument("--requests", type=int, default=None, help="Request per level konkurensi (default: 2 x level)")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Latensi simulasi LLM stub (detik)")
+    parser.add_argument("--output", help="Simpan hasil sebagai JSON")
+    parser.add_argument("--compare", help="JSON hasil sebelumnya untuk dibandingkan")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Selisih relatif yang dianggap regresi")
+    args = parser.parse_args()
+
+    app.llm_backend = StubLLMBackend(args.llm_latency)
+    app.result_cache = None # Juga jika app sudah diimpor sebelum RESULT_CACHE=0 diatur
+    load_start = time.perf_counter()
+    app.warm_up_models()
+    print(f"--- Model dimuat dalam {time.perf_counter() - load_start:.1f}s ---")
+
+    ffmpeg = find_ffmpeg()
+    fixtures = [ensure_fixture(spec, args.fixture_dir, ffmpeg) for spec in args.fixtures]
+
+    results = []
+
+    def record(suite, fixture, result, **extra):
+        entry = {"id": "/".join([suite, fixture["name"], *(f"{k}={v}" for k, v in extra.items())]),
+                 "suite": suite, "fixture": fixture["name"], **extra, **result}
+        results.append(entry)
+        print(json.dumps({key: value for key, value in entry.items() if key != "samples"}))
+
+    for fixture in fixtures:
+        if "cv" in args.suites:
+            record("cv", fixture, bench_cv(fixture, args.repeat))
+        if "stt" in args.suites:
+            record("stt", fixture, bench_stt(fixture, args.repeat))
+        if "e2e" in args.suites:
+            record("e2e", fixture, bench_e2e(fixture, args.repeat))
+    if "concurrency" in args.suites:
+        # Konkurensi diukur pada fixture pertama (paling pendek secara default)
+        for level in args.concurrency:
+            record("concurrency", fixtures[0], bench_concurrency(fixtures[0], level, args.requests or 2 * level),
+                   concurrency=level)
+
+    report = {
+        "meta": {
+            "git": git_info(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "config": run_config(),
+            "llm_latency": args.llm_latency,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare_reports(report, json.load(f), args.threshold)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
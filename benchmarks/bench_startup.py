@@ -0,0 +1,93 @@
+"""
+Benchmark waktu startup: biaya `import app` per mode MODEL_WARMUP dan modul import terberat.
+
+Setiap pengukuran dijalankan di proses Python baru (cache modul kosong), sehingga angka yang
+dilaporkan sama dengan waktu startup server / worker sebenarnya.
+- lazy  : MODEL_WARMUP=0, import tanpa memuat model
+- eager : MODEL_WARMUP=eager, import + pemuatan dan warm-up Whisper/YOLO (perilaku lama)
+- first_use : import lazy lalu warm_up_models() (biaya yang dipindahkan ke request/warm-up pertama)
+
+Contoh:
+    python benchmarks/bench_startup.py --repeat 3 --top 15 --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODES = {
+    "lazy": ("0", "import app"),
+    "eager": ("eager", "import app"),
+    "first_use": ("0", "import app; app.warm_up_models()"),
+}
+
+TIMER_SNIPPET = (
+    "import json, time; _start = time.perf_counter(); {statement}; "
+    "print('BENCH ' + json.dumps({{'seconds': time.perf_counter() - _start}}))"
+)
+
+
+def run_python(code, env_overrides, extra_args=()):
+    env = dict(os.environ, RESULT_CACHE="0", **env_overrides)
+    return subprocess.run(
+        [sys.executable, *extra_args, "-c", code], cwd=REPO_ROOT, env=env, capture_output=True, text=True
+    )
+
+
+def time_mode(warmup, statement):
+    completed = run_python(TIMER_SNIPPET.format(statement=statement), {"MODEL_WARMUP": warmup})
+    for line in completed.stdout.splitlines():
+        if line.startswith("BENCH "):
+            return json.loads(line[len("BENCH "):])["seconds"]
+    raise RuntimeError(f"Benchmark process failed:\n{completed.stderr[-2000:]}")
+
+
+def slowest_imports(top):
+    """Modul dengan waktu import kumulatif terbesar (python -X importtime) pada mode lazy."""
+    completed = run_python("import app", {"MODEL_WARMUP": "0"}, extra_args=("-X", "importtime"))
+    entries = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        entries.append({"module": module.strip(), "cumulative_seconds": int(cumulative) / 1e6})
+    entries.sort(key=lambda entry: entry["cumulative_seconds"], reverse=True)
+    return entries[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES))
+    parser.add_argument("--repeat", type=int, default=3, help="Pengulangan per mode (dilaporkan median)")
+    parser.add_argument("--top", type=int, default=10, help="Jumlah modul import terberat yang ditampilkan")
+    parser.add_argument("--output", help="Simpan hasil sebagai JSON")
+    args = parser.parse_args()
+
+    report = {"python": sys.version.split()[0], "modes": []}
+    for mode in args.modes:
+        warmup, statement = MODES[mode]
+        samples = [time_mode(warmup, statement) for _ in range(args.repeat)]
+        entry = {
+            "mode": mode,
+            "median_seconds": round(statistics.median(samples), 3),
+            "min_seconds": round(min(samples), 3),
+            "samples": [round(sample, 3) for sample in samples],
+        }
+        report["modes"].append(entry)
+        print(json.dumps(entry))
+
+    report["slowest_imports"] = slowest_imports(args.top)
+    for entry in report["slowest_imports"]:
+        print(f"{entry['cumulative_seconds']:8.3f}s  {entry['module']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
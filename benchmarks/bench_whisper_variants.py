@@ -0,0 +1,121 @@
+"""
+Benchmark varian Whisper ONNX: latensi dan pergeseran transkrip (WER) terhadap baseline.
+
+Baseline adalah varian pertama pada --variants (default: no-cache FP32, setup awal).
+Setiap varian lain dibandingkan per fixture dengan transkrip baseline.
+
+Contoh:
+    python benchmarks/bench_whisper_variants.py --fixtures ./fixtures/audio \\
+        --variants no-cache with-past merged no-cache:int8 merged:int8 --output whisper_variants.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import librosa
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MODEL_WARMUP", "0") # Varian dimuat sendiri oleh benchmark, bukan oleh app
+
+import app  # noqa: E402
+
+AUDIO_EXTENSIONS = {".wav", ".flac", ".mp3", ".ogg", ".m4a", ".mp4", ".webm", ".mov", ".mkv", ".avi"}
+
+
+def word_error_rate(reference, hypothesis):
+    """WER berbasis jarak Levenshtein tingkat kata (huruf kecil, tanpa tanda baca)."""
+    ref = app._normalize_words(reference)
+    hyp = app._normalize_words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, start=1):
+            current[j] = min(
+                previous[j] + 1,                              # deletion
+                current[j - 1] + 1,                           # insertion
+                previous[j - 1] + (ref_word != hyp_word),     # substitution
+            )
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def load_fixtures(fixture_dir):
+    fixtures = []
+    for file_name in sorted(os.listdir(fixture_dir)):
+        if os.path.splitext(file_name)[1].lower() in AUDIO_EXTENSIONS:
+            audio, _ = librosa.load(os.path.join(fixture_dir, file_name), sr=16000, mono=True)
+            fixtures.append((file_name, audio.astype(np.float32)))
+    if not fixtures:
+        raise SystemExit(f"No audio fixtures found in {fixture_dir}")
+    return fixtures
+
+
+def parse_variant(spec):
+    # "merged:int8" -> ("merged", True)
+    name, _, suffix = spec.partition(":")
+    return name, suffix.lower() == "int8"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", required=True, help="Direktori berisi file audio/video uji")
+    parser.add_argument("--variants", nargs="+", default=["no-cache", "with-past", "merged"],
+                        help="Varian: no-cache, with-past, merged; tambahkan ':int8' untuk varian kuantisasi")
+    parser.add_argument("--repeat", type=int, default=1, help="Pengulangan per fixture (latensi = median)")
+    parser.add_argument("--output", help="Simpan hasil sebagai JSON")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures)
+    total_audio_seconds = sum(len(audio) for _, audio in fixtures) / 16000
+    baseline_transcripts = None
+    report = []
+
+    for spec in args.variants:
+        variant, quantized = parse_variant(spec)
+        load_start = time.perf_counter()
+        asr, provider = app.load_whisper_pipeline(variant, quantized)
+        load_seconds = time.perf_counter() - load_start
+        asr(fixtures[0][1].copy()) # Warm-up
+
+        per_fixture = []
+        for file_name, audio in fixtures:
+            latencies = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                text = asr(audio.copy())["text"]
+                latencies.append(time.perf_counter() - start)
+            per_fixture.append({"fixture": file_name, "latency": round(statistics.median(latencies), 4), "text": text})
+
+        if baseline_transcripts is None:
+            baseline_transcripts = [item["text"] for item in per_fixture]
+        for item, reference in zip(per_fixture, baseline_transcripts):
+            item["wer_vs_baseline"] = round(word_error_rate(reference, item["text"]), 4)
+
+        total_latency = sum(item["latency"] for item in per_fixture)
+        entry = {
+            "variant": spec,
+            "provider": provider,
+            "load_seconds": round(load_seconds, 3),
+            "total_latency": round(total_latency, 3),
+            "real_time_factor": round(total_latency / total_audio_seconds, 4),
+            "mean_wer_vs_baseline": round(statistics.mean(item["wer_vs_baseline"] for item in per_fixture), 4),
+            "fixtures": per_fixture,
+        }
+        report.append(entry)
+        print(json.dumps({key: value for key, value in entry.items() if key != "fixtures"}))
+        del asr
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Fixture video/audio sintetis untuk benchmark (offline, deterministik).
+
+Spesifikasi fixture berbentuk "<durasi>s@<lebar>x<tinggi>", mis. "30s@1280x720". Video dibuat dengan
+cv2.VideoWriter (wajah sederhana yang bergerak di atas latar bernoise), audio berupa nada + noise
+16 kHz, lalu keduanya digabung dengan ffmpeg. Seed tetap sehingga file yang sama dihasilkan ulang
+di setiap mesin; file yang sudah ada dipakai ulang.
+"""
+import os
+import re
+import subprocess
+
+import cv2
+import numpy as np
+import soundfile as sf
+
+DEFAULT_SPECS = ("10s@640x360", "30s@640x360", "30s@1280x720")
+FIXTURE_FPS = 30
+AUDIO_SAMPLE_RATE = 16000
+SPEC_PATTERN = re.compile(r"^(\d+(?:\.\d+)?)s@(\d+)x(\d+)$")
+
+
+def parse_spec(spec):
+    match = SPEC_PATTERN.match(spec)
+    if not match:
+        raise ValueError(f"Invalid fixture spec '{spec}'. Use <seconds>s@<width>x<height>, e.g. 30s@1280x720.")
+    return float(match.group(1)), int(match.group(2)), int(match.group(3))
+
+
+def write_video(path, seconds, width, height, fps=FIXTURE_FPS, seed=0):
+    """Video tanpa audio: wajah (elips + dua mata) yang bergeser kiri-kanan, latar noise statis."""
+    rng = np.random.default_rng(seed)
+    background = rng.integers(40, 90, size=(height, width, 3), dtype=np.uint8)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError(f"cv2.VideoWriter cannot write {path}")
+    face_w, face_h = width // 8, height // 4
+    try:
+        for i in range(int(seconds * fps)):
+            frame = background.copy()
+            cx = int(width / 2 + np.sin(i / fps) * width / 6)
+            cy = height // 2
+            cv2.ellipse(frame, (cx, cy), (face_w, face_h), 0, 0, 360, (150, 180, 210), -1)
+            for dx in (-face_w // 3, face_w // 3):
+                cv2.circle(frame, (cx + dx, cy - face_h // 4), max(2, face_w // 10), (30, 30, 30), -1)
+            writer.write(frame)
+    finally:
+        writer.release()
+
+
+def write_audio(path, seconds, sample_rate=AUDIO_SAMPLE_RATE, seed=0):
+    """Nada dengan frekuensi berubah per 0.5 detik ditambah noise, mono 16 kHz."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    frequencies = rng.uniform(120, 400, size=int(seconds * 2) + 1)[(t * 2).astype(int)]
+    audio = 0.3 * np.sin(2 * np.pi * frequencies * t) + 0.05 * rng.standard_normal(t.size)
+    sf.write(path, audio.astype(np.float32), sample_rate)
+
+
+def mux(video_path, audio_path, output_path, ffmpeg):
+    subprocess.run(
+        [ffmpeg, "-y", "-loglevel", "error", "-i", video_path, "-i", audio_path,
+         "-c:v", "copy", "-c:a", "aac", "-shortest", output_path],
+        check=True,
+    )
+
+
+def ensure_fixture(spec, directory, ffmpeg=None):
+    """
+    Membuat (atau memakai ulang) fixture untuk satu spec. Mengembalikan dict berisi path
+    video (dengan audio jika ffmpeg tersedia), path audio WAV dan metadata.
+    """
+    seconds, width, height = parse_spec(spec)
+    os.makedirs(directory, exist_ok=True)
+    name = spec.replace("@", "_")
+    silent_video = os.path.join(directory, f"{name}_video.mp4")
+    audio_path = os.path.join(directory, f"{name}.wav")
+    video_path = os.path.join(directory, f"{name}.mp4")
+
+    if not os.path.exists(silent_video):
+        write_video(silent_video, seconds, width, height)
+    if not os.path.exists(audio_path):
+        write_audio(audio_path, seconds)
+    has_audio = False
+    if ffmpeg:
+        if not os.path.exists(video_path):
+            mux(silent_video, audio_path, video_path, ffmpeg)
+        has_audio = True
+    else:
+        video_path = silent_video
+
+    return {"name": spec, "seconds": seconds, "width": width, "height": height,
+            "video_path": video_path, "audio_path": audio_path, "has_audio": has_audio}
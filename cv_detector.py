@@ -1,29 +1,87 @@
 import cv2
-from ultralytics import YOLO
 import math
 import os
+import random
+import threading
+import time
 import traceback
-import torch
+import numpy as np
+from frame_sampler import iter_sampled_frames, count_target_frames, get_source_fps
+from media_ingest import MediaIngestError
+from metrics import METRICS, record_stage
+from pose_onnx import OnnxPoseModel, FaceRegionTracker
 
 # ========================= MODEL INITIALIZATION =========================
+# Model dimuat secara lazy (saat pertama dipakai atau oleh warm-up di app.py), sehingga import modul
+# ini tidak ikut menanggung biaya import torch/ultralytics dan pemuatan bobot YOLO.
 CV_MODEL_PATH = "computer_vision_model/yolo11n-pose.pt"
-POSE_MODEL = None 
+if not os.path.exists(CV_MODEL_PATH):
+    CV_MODEL_PATH = "yolo11n-pose.pt" # Fallback ke root
 
-CV_DEVICE = 'cuda:0' if torch.cuda.is_available() else 'cpu' 
-print(f"Menggunakan Perangkat CV: {CV_DEVICE}")
+# Backend pose: "ultralytics" (PyTorch, model .pt) atau "onnx" (onnxruntime, hasil tools/export_pose_onnx.py).
+# Backend onnx tidak mengimpor torch/ultralytics dan berjalan pada resolusi input lebih kecil (CV_POSE_IMGSZ).
+CV_POSE_BACKEND = os.environ.get("CV_POSE_BACKEND", "ultralytics").lower()
+CV_POSE_IMGSZ = int(os.environ.get("CV_POSE_IMGSZ", 320))
+CV_POSE_PROVIDER = os.environ.get("CV_POSE_PROVIDER", "cpu").lower() # cpu / openvino / cuda
+CV_POSE_ROI = os.environ.get("CV_POSE_ROI", "0") == "1" # Crop area wajah dari frame sebelumnya (backend onnx)
+if CV_POSE_BACKEND == "onnx":
+    CV_MODEL_PATH = os.environ.get("CV_ONNX_MODEL_PATH", "computer_vision_model/yolo11n-pose.onnx")
 
-try:
-    # Cek apakah file model ada
-    if not os.path.exists(CV_MODEL_PATH):
-        CV_MODEL_PATH = "yolo11n-pose.pt" # Fallback ke root
-        if not os.path.exists(CV_MODEL_PATH):
-             raise FileNotFoundError(f"Model file not found at {CV_MODEL_PATH}")
+POSE_MODEL = None
+POSE_MODEL_ERROR = None # Pesan error jika pemuatan gagal (tidak dicoba ulang)
+CV_DEVICE = None
+_pose_model_lock = threading.Lock()
 
-    # Pemuatan model hanya sekali saat server start
-    POSE_MODEL = YOLO(CV_MODEL_PATH)
-    print("--- Model YOLO-Pose Berhasil Dimuat (Global) ---")
-except Exception as e:
-    print(f"ERROR: Gagal memuat model YOLO-Pose. Detail: {e}")
+
+def get_pose_model():
+    """Memuat YOLO-Pose sekali (thread-safe). Mengembalikan None jika model gagal dimuat."""
+    global POSE_MODEL, POSE_MODEL_ERROR, CV_DEVICE
+    if POSE_MODEL is not None or POSE_MODEL_ERROR is not None:
+        return POSE_MODEL
+
+    with _pose_model_lock:
+        if POSE_MODEL is not None or POSE_MODEL_ERROR is not None:
+            return POSE_MODEL
+        try:
+            if not os.path.exists(CV_MODEL_PATH):
+                raise FileNotFoundError(f"Model file not found at {CV_MODEL_PATH}")
+
+            if CV_POSE_BACKEND == "onnx":
+                POSE_MODEL = OnnxPoseModel(
+                    CV_MODEL_PATH, imgsz=CV_POSE_IMGSZ, provider=CV_POSE_PROVIDER,
+                    intra_op_threads=int(os.environ.get("ORT_INTRA_OP_THREADS", 0)),
+                )
+                CV_DEVICE = POSE_MODEL.provider
+            else:
+                import torch
+                from ultralytics import YOLO
+
+                CV_DEVICE = 'cuda:0' if torch.cuda.is_available() else 'cpu'
+                POSE_MODEL = YOLO(CV_MODEL_PATH)
+            print(f"Menggunakan Perangkat CV: {CV_DEVICE}")
+            print(f"--- Model YOLO-Pose Berhasil Dimuat (Global, backend {CV_POSE_BACKEND}) ---")
+        except Exception as e:
+            POSE_MODEL_ERROR = str(e)
+            print(f"ERROR: Gagal memuat model YOLO-Pose. Detail: {e}")
+    return POSE_MODEL
+
+
+def warm_up_pose_model():
+    """Memuat model lalu menjalankan satu inferensi pada frame kosong agar request pertama tidak lambat."""
+    if get_pose_model() is None:
+        return False
+    infer_keypoints_batch([np.zeros((480, 640, 3), dtype=np.uint8)])
+    return True
+
+
+def pose_model_status():
+    return {"loaded": POSE_MODEL is not None, "error": POSE_MODEL_ERROR, "path": CV_MODEL_PATH, "device": CV_DEVICE,
+            "backend": CV_POSE_BACKEND}
+
+
+def new_face_tracker():
+    """Tracker area wajah untuk satu video (hanya backend onnx dengan CV_POSE_ROI=1), selain itu None."""
+    return FaceRegionTracker() if CV_POSE_BACKEND == "onnx" and CV_POSE_ROI else None
 
 
 # Keypoint IDs: Nose (0), Right Eye (1), Left Eye (2)
@@ -31,7 +89,39 @@ NOSE_KP_ID = 0
 RIGHT_EYE_KP_ID = 1
 LEFT_EYE_KP_ID = 2
 THRESHOLD = 15 # Threshold deviasi horizontal (dalam piksel, dapat disesuaikan)
+MIN_EYE_DISTANCE = 30 # Jarak antar mata minimum (piksel); di bawahnya wajah dianggap terlalu jauh
+AWAY_CONFIDENCE_THRESHOLD = 0.5 # Frame dihitung 'away' hanya jika confidence di atas nilai ini
+INTEGRITY_THRESHOLD = 0.20 # Rasio frame 'away' di atas nilai ini dianggap potensi curang
 FRAME_SKIP_RATE = 5 # Sampling: Proses 1 dari setiap 5 frame (efisiensi)
+CV_BATCH_SIZE = int(os.environ.get("CV_BATCH_SIZE", 16)) # Jumlah frame sampel per inferensi YOLO (1 = per-frame)
+CV_SAMPLING_MODE = os.environ.get("CV_SAMPLING_MODE", "grab") # read / grab / seek (lihat frame_sampler.py)
+# Sampling berbasis waktu: N frame per detik video. Kosong = pakai FRAME_SKIP_RATE.
+CV_SAMPLE_FPS = float(os.environ["CV_SAMPLE_FPS"]) if os.environ.get("CV_SAMPLE_FPS") else None
+
+# Mode adaptif (CV_ADAPTIVE=1): dari frame sampel di atas, inferensi makin jarang selama status gaze stabil,
+# kembali rapat setelah perubahan, dan pemindaian berhenti lebih awal begitu keputusan INTEGRITY_THRESHOLD
+# sudah pasti (lihat AdaptiveGazeSampler).
+#   sequential : satu frame acak per blok (ukuran blok adaptif) + confidence sequence (default)
+#   exact      : semua frame sampel diinferensi; berhenti hanya jika skenario terburuk sisa video tidak
+#                dapat lagi mengubah keputusan (konservatif, tanpa peluang salah dari subsampling)
+ADAPTIVE_MODES = ("sequential", "exact")
+CV_ADAPTIVE = os.environ.get("CV_ADAPTIVE", "0") == "1"
+CV_ADAPTIVE_MODE = os.environ.get("CV_ADAPTIVE_MODE", "sequential").lower()
+CV_ADAPTIVE_MAX_STRIDE = int(os.environ.get("CV_ADAPTIVE_MAX_STRIDE", 8)) # Maks. frame sampel per satu inferensi
+CV_ADAPTIVE_STABLE_PROBES = 3 # Blok berturut-turut dengan status sama sebelum ukuran blok digandakan
+CV_ADAPTIVE_DELTA = float(os.environ.get("CV_ADAPTIVE_DELTA", 0.05)) # Batas peluang keputusan early exit salah
+CV_ADAPTIVE_SEED = 0 # Seed pemilihan frame acak per blok: video yang sama selalu menghasilkan nilai yang sama
+CV_ADAPTIVE_FRAME_COUNT_SLACK = 0.02 # Cadangan jika jumlah frame di metadata container lebih kecil dari sebenarnya
+
+
+def cv_config_fingerprint():
+    """Ringkasan konfigurasi yang memengaruhi hasil CV (dipakai sebagai bagian key cache hasil)."""
+    return (
+        f"model={CV_MODEL_PATH}:skip={FRAME_SKIP_RATE}:fps={CV_SAMPLE_FPS}:mode={CV_SAMPLING_MODE}"
+        f":th={THRESHOLD}:eye={MIN_EYE_DISTANCE}:conf={AWAY_CONFIDENCE_THRESHOLD}:integrity={INTEGRITY_THRESHOLD}"
+        + (f":backend=onnx:imgsz={CV_POSE_IMGSZ}:roi={int(CV_POSE_ROI)}" if CV_POSE_BACKEND == "onnx" else "")
+        + (f":adaptive={CV_ADAPTIVE_MODE}/{CV_ADAPTIVE_MAX_STRIDE}/{CV_ADAPTIVE_DELTA}" if CV_ADAPTIVE else "")
+    )
 
 # ========================= UTILITY FUNCTIONS =========================
 def get_gaze_direction(kp):
@@ -64,7 +154,7 @@ def get_gaze_direction(kp):
     # Confidence dihitung berdasarkan deviasi relatif terhadap jarak antar mata
     eye_distance = math.sqrt((rx - lx)**2 + (ry - ly)**2)
     
-    if eye_distance < 30: # Jika wajah terlalu jauh
+    if eye_distance < MIN_EYE_DISTANCE: # Jika wajah terlalu jauh
         confidence = 0.0 
     else:
         relative_deviasi = abs(diff_x) / eye_distance 
@@ -73,13 +163,362 @@ def get_gaze_direction(kp):
     return gaze, round(confidence, 2)
 
 
+def infer_keypoints_batch(frames, tracker=None):
+    """
+    Menjalankan YOLO-Pose sekali untuk sekumpulan frame.
+    Mengembalikan array (N, 17, 2) berisi keypoint orang pertama per frame;
+    baris bernilai NaN jika tidak ada orang terdeteksi pada frame tersebut.
+    tracker (FaceRegionTracker, backend onnx) meng-crop frame ke area wajah dari batch sebelumnya.
+    """
+    model = get_pose_model()
+    if CV_POSE_BACKEND == "onnx":
+        return model.infer_keypoints(frames, tracker)
+
+    results = model(frames, verbose=False, device=CV_DEVICE)
+
+    first_person = []
+    for r in results:
+        if r.keypoints is None or len(r.keypoints.xy) == 0:
+            first_person.append(None)
+        else:
+            first_person.append(r.keypoints.xy[0])
+
+    detected = [kp for kp in first_person if kp is not None]
+    num_keypoints = detected[0].shape[0] if detected else 17
+    keypoints = np.full((len(frames), num_keypoints, 2), np.nan, dtype=np.float32)
+    if detected:
+        import torch # Sudah dimuat bersama model; import lokal agar import modul tetap ringan
+
+        # Satu kali salin dari device ke CPU untuk seluruh batch
+        detected_xy = torch.stack(detected).cpu().numpy()
+        rows = [i for i, kp in enumerate(first_person) if kp is not None]
+        keypoints[rows] = detected_xy
+    return keypoints
+
+
+# Kode gaze untuk perhitungan vektor (indeks ke GAZE_LABELS)
+GAZE_FORWARD, GAZE_LEFT, GAZE_RIGHT, GAZE_UNKNOWN = 0, 1, 2, 3
+GAZE_LABELS = ("Looking Forward", "Looking Left (Away)", "Looking Right (Away)", "Unknown")
+
+
+def compute_gaze_batch(keypoints):
+    """
+    Versi vektor dari get_gaze_direction untuk seluruh frame sekaligus.
+
+    keypoints: array (N, K, 2) keypoint orang pertama per frame sampel; baris NaN = tidak ada deteksi.
+    Mengembalikan dict berisi gaze_codes (N,), confidences (N,), away (N,) dan eye_movement_ratio.
+    Aturan THRESHOLD, MIN_EYE_DISTANCE dan AWAY_CONFIDENCE_THRESHOLD sama dengan jalur per-frame.
+    """
+    kp = np.asarray(keypoints, dtype=np.float64).reshape(len(keypoints), -1, 2)
+    num_frames = kp.shape[0]
+    if num_frames == 0 or kp.shape[1] < 3:
+        return {
+            "gaze_codes": np.full(num_frames, GAZE_UNKNOWN, dtype=np.int8),
+            "confidences": np.zeros(num_frames),
+            "away": np.zeros(num_frames, dtype=bool),
+            "eye_movement_ratio": 0.0,
+        }
+
+    nose = kp[:, NOSE_KP_ID]
+    right_eye = kp[:, RIGHT_EYE_KP_ID]
+    left_eye = kp[:, LEFT_EYE_KP_ID]
+    detected = ~np.isnan(kp[:, [NOSE_KP_ID, RIGHT_EYE_KP_ID, LEFT_EYE_KP_ID]]).any(axis=(1, 2))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        diff_x = nose[:, 0] - (right_eye[:, 0] + left_eye[:, 0]) / 2
+
+        # Logika Arah Pandangan (Horizontal)
+        gaze_codes = np.full(num_frames, GAZE_FORWARD, dtype=np.int8)
+        gaze_codes[diff_x > THRESHOLD] = GAZE_LEFT
+        gaze_codes[diff_x < -THRESHOLD] = GAZE_RIGHT
+        gaze_codes[~detected] = GAZE_UNKNOWN
+
+        # Confidence: deviasi relatif terhadap jarak antar mata, 0 jika wajah terlalu jauh
+        eye_distance = np.hypot(right_eye[:, 0] - left_eye[:, 0], right_eye[:, 1] - left_eye[:, 1])
+        confidences = np.minimum(np.abs(diff_x) / eye_distance * 1.5, 1.0)
+    confidences = np.where(detected & (eye_distance >= MIN_EYE_DISTANCE), confidences, 0.0)
+    confidences = np.round(confidences, 2)
+
+    away = (gaze_codes != GAZE_FORWARD) & (gaze_codes != GAZE_UNKNOWN) & (confidences > AWAY_CONFIDENCE_THRESHOLD)
+
+    return {
+        "gaze_codes": gaze_codes,
+        "confidences": confidences,
+        "away": away,
+        "eye_movement_ratio": float(away.sum()) / num_frames,
+    }
+
+
+def build_gaze_timeline(frame_indices, timestamps_ms, gaze):
+    """Menyusun timeline per frame sampel dari hasil compute_gaze_batch (untuk tooling reviewer)."""
+    return [
+        {
+            "frame": int(frame_index),
+            "timestamp_ms": round(float(timestamp_ms), 1),
+            "gaze": GAZE_LABELS[code],
+            "confidence": float(confidence),
+            "away": bool(is_away),
+        }
+        for frame_index, timestamp_ms, code, confidence, is_away in zip(
+            frame_indices, timestamps_ms, gaze["gaze_codes"], gaze["confidences"], gaze["away"]
+        )
+    ]
+
+
+# ================= SAMPLING ADAPTIF & EARLY EXIT =================
+def expected_sample_count(frame_count, source_fps, sample_fps=None, frame_step=FRAME_SKIP_RATE):
+    """
+    Batas atas jumlah frame sampel video dari metadata container (jumlah frame + fps), ditambah
+    CV_ADAPTIVE_FRAME_COUNT_SLACK. None jika tidak diketahui (mis. webm dari MediaRecorder browser).
+    """
+    if not frame_count or frame_count != frame_count or frame_count <= 0: # frame_count != frame_count menangkap NaN
+        return None
+    samples = count_target_frames(int(frame_count), source_fps, frame_step, sample_fps)
+    return int(math.ceil(samples * (1 + CV_ADAPTIVE_FRAME_COUNT_SLACK))) + 1
+
+
+# Grid lambda untuk confidence sequence (skala: jumlah frame); 2^-15 .. 1 mencakup video pendek hingga panjang
+SEQUENTIAL_LAMBDAS = tuple(2.0 ** -j for j in range(16))
+
+
+def sequential_deviation(variance, delta):
+    """
+    Lebar confidence sequence untuk galat estimasi jumlah frame 'away', valid di setiap titik berhenti.
+
+    Setiap blok subsampel menyumbang galat martingale dengan rentang = ukuran blok, sehingga
+    exp(l * galat - l^2 * variance / 8) adalah supermartingale (Hoeffding-Azuma, variance = jumlah kuadrat
+    ukuran blok). Ketidaksamaan Ville + union bound atas SEQUENTIAL_LAMBDAS dan kedua arah memberi
+    |galat| <= lebar untuk seluruh pemindaian dengan peluang >= 1 - delta.
+    """
+    if variance <= 0:
+        return 0.0
+    log_term = math.log(2 * len(SEQUENTIAL_LAMBDAS) / delta)
+    return min(log_term / lam + lam * variance / 8 for lam in SEQUENTIAL_LAMBDAS)
+
+
+def sequential_confidence(margin, variance):
+    """Kebalikan sequential_deviation: 1 - delta terkecil yang lebarnya masih di bawah margin."""
+    if margin <= 0:
+        return 0.0
+    exponent = min(-lam * (margin - lam * variance / 8) for lam in SEQUENTIAL_LAMBDAS)
+    error = 2 * len(SEQUENTIAL_LAMBDAS) * math.exp(min(exponent, 0.0))
+    return max(0.0, 1.0 - error)
+
+
+class AdaptiveGazeSampler:
+    """
+    Inferensi YOLO adaptif di atas iterator frame sampel (OpenCV atau MediaIngest).
+
+    - Blok: frame sampel dipindai per blok berurutan. Blok berukuran 1 (diinferensi semua, per batch_size
+      frame) setelah perubahan status; setelah CV_ADAPTIVE_STABLE_PROBES blok berturut-turut dengan status
+      sama, ukuran blok digandakan (maks. max_stride, dan hanya selama _affordable). Dari blok berukuran s hanya SATU frame yang dipilih
+      acak dan diinferensi; jumlah 'away' blok diestimasi s x status frame tersebut (estimator
+      Horvitz-Thompson, tidak bias karena ukuran blok ditentukan sebelum frame acaknya dilihat). Status
+      frame tidak disalin ke frame lain, dan blok tempat perubahan terjadi tidak diinferensi ulang
+      (pilihan yang bergantung pada frame acak itu sendiri membuat estimasi bias).
+    - Early exit: dengan N = expected_samples, pemindaian berhenti jika, untuk galat subsampel di dalam
+      confidence sequence (sequential_deviation) DAN skenario terburuk frame yang belum dipindai
+      (semuanya 'forward' atau semuanya 'away'), rasio seluruh video tetap berada di sisi threshold yang
+      sama dengan peluang salah <= delta. Urutan waktu tidak diasumsikan acak: sisa video tidak
+      diekstrapolasi dari bagian awal. Tanpa expected_samples seluruh video dipindai.
+    - mode="exact": max_stride = 1 (semua frame diinferensi, galat subsampel nol), sehingga hanya aturan
+      skenario terburuk yang berlaku.
+    decision_confidence = keyakinan bahwa cheating_flag sama dengan hasil pemindaian penuh. Jaminan early
+    exit (kedua mode) hanya berlaku jika expected_samples tidak lebih kecil dari jumlah frame sampel
+    sebenarnya; jumlah frame dari metadata container (atau durasi x fps pada MediaIngest) hanya perkiraan
+    dan dapat meleset pada video variable-frame-rate atau hasil remux.
+    """
+
+    def __init__(self, expected_samples=None, mode=CV_ADAPTIVE_MODE, threshold=INTEGRITY_THRESHOLD,
+                 max_stride=CV_ADAPTIVE_MAX_STRIDE, stable_probes=CV_ADAPTIVE_STABLE_PROBES, delta=CV_ADAPTIVE_DELTA,
+                 batch_size=CV_BATCH_SIZE, seed=CV_ADAPTIVE_SEED, tracker=None):
+        if mode not in ADAPTIVE_MODES:
+            raise ValueError(f"Unknown adaptive mode '{mode}'. Use one of {ADAPTIVE_MODES}.")
+        self.expected_samples = expected_samples
+        self.mode = mode
+        self.threshold = threshold
+        self.max_stride = 1 if mode == "exact" else max(1, max_stride)
+        self.stable_probes = max(1, stable_probes)
+        self.delta = delta
+        self.batch_size = max(1, batch_size)
+        self.tracker = tracker
+        self._random = random.Random(seed)
+
+        self.frame_indices = []
+        self.timestamps_ms = []
+        self.keypoints = []
+        self.frames_covered = 0    # Frame sampel di blok yang sudah diproses (diinferensi atau diestimasi)
+        self.away_estimate = 0.0   # Estimasi jumlah frame 'away' di antara frames_covered
+        self.variance = 0.0        # Jumlah kuadrat ukuran blok subsampel (0 = semua frame diinferensi)
+        self.infer_seconds = 0.0
+        self.frames_scanned = 0
+        self.early_exit = False
+        self._stride = 1
+        self._stable = 0
+        self._last_away = None
+
+    def run(self, frames):
+        block = []
+        for item in frames:
+            self.frames_scanned = item[0] + 1
+            block.append(item)
+            # Blok berukuran 1 dikumpulkan per batch_size frame agar YOLO tetap berjalan per batch
+            if len(block) < (self.batch_size if self._stride == 1 else self._stride):
+                continue
+            self._process(block)
+            block = []
+            if self._settled():
+                self.early_exit = True
+                break
+        if block:
+            self._process(block)
+        return self
+
+    @property
+    def frames_inferred(self):
+        return len(self.frame_indices)
+
+    @property
+    def eye_movement_ratio(self):
+        """Estimasi rasio 'away' pada frame sampel yang sudah dipindai."""
+        return self.away_estimate / self.frames_covered if self.frames_covered else 0.0
+
+    @property
+    def total_samples(self):
+        """N untuk keputusan: expected_samples saat early exit, selain itu frame yang dipindai."""
+        return self.expected_samples if self.early_exit else self.frames_covered
+
+    @property
+    def decision_confidence(self):
+        total = self.total_samples
+        if not total:
+            return 0.0
+        remaining = total - self.frames_covered
+        cheating_margin = self.away_estimate - self.threshold * total
+        clean_margin = self.threshold * total - (self.away_estimate + remaining)
+        if self.variance <= 0:
+            return 1.0 if cheating_margin > 0 or clean_margin >= 0 else 0.0
+        return sequential_confidence(max(cheating_margin, clean_margin), self.variance)
+
+    @property
+    def ratio_bounds(self):
+        """Rentang rasio 'away' seluruh video pada tingkat keyakinan 1 - delta."""
+        total = self.total_samples
+        if not total:
+            return 0.0, 0.0
+        deviation = sequential_deviation(self.variance, self.delta)
+        low = max(0.0, self.away_estimate - deviation)
+        high = min(float(self.frames_covered), self.away_estimate + deviation) + (total - self.frames_covered)
+        return low / total, high / total
+
+    # ------ INTERNAL ------
+    def _infer(self, items):
+        start = time.perf_counter()
+        keypoints = infer_keypoints_batch([frame for _, _, frame in items], self.tracker)
+        self.infer_seconds += time.perf_counter() - start
+        for (frame_index, timestamp_ms, _), kp in zip(items, keypoints):
+            self.frame_indices.append(frame_index)
+            self.timestamps_ms.append(timestamp_ms)
+            self.keypoints.append(kp)
+        return compute_gaze_batch(keypoints)["away"]
+
+    def _process(self, block):
+        self.frames_covered += len(block)
+        if self._stride == 1:
+            # Setiap frame adalah blok sendiri: diinferensi semua, tanpa galat subsampel
+            for is_away in self._infer(block):
+                self.away_estimate += bool(is_away)
+                self._observe(bool(is_away))
+            return
+        probe = block[self._random.randrange(len(block))]
+        is_away = bool(self._infer([probe])[0])
+        self.away_estimate += len(block) * is_away
+        self.variance += len(block) ** 2
+        self._observe(is_away)
+
+    def _observe(self, is_away):
+        if self._last_away is not None and is_away != self._last_away:
+            self._stride, self._stable = 1, 0
+        else:
+            self._stable += 1
+            if self._stable >= self.stable_probes:
+                stride = min(self._stride * 2, self.max_stride)
+                if self._affordable(stride):
+                    self._stride = stride
+                self._stable = 0
+        self._last_away = is_away
+
+    def _affordable(self, stride):
+        """
+        Blok diperbesar hanya jika galat subsampel yang diproyeksikan hingga akhir video (sisa frame dengan
+        blok berukuran stride) masih lebih kecil dari jarak estimasi saat ini ke threshold. Video pendek
+        dan rasio yang dekat threshold tetap dipindai rapat. Tanpa expected_samples, sisa video
+        diasumsikan sepanjang bagian yang sudah dipindai (hanya untuk perencanaan, bukan untuk keputusan).
+        """
+        total = self.expected_samples or 2 * self.frames_covered
+        remaining = max(0, total - self.frames_covered)
+        projected = sequential_deviation(self.variance + remaining * stride, self.delta)
+        return projected < abs(self.eye_movement_ratio - self.threshold) * total
+
+    def _settled(self):
+        if self.expected_samples is None:
+            return False
+        if self.frames_covered > self.expected_samples:
+            # Metadata container meleset: N tidak valid, pindai sampai selesai
+            self.expected_samples = None
+            return False
+        total = self.expected_samples
+        deviation = sequential_deviation(self.variance, self.delta)
+        remaining = total - self.frames_covered
+        cheating = (self.away_estimate - deviation) / total > self.threshold
+        clean = (self.away_estimate + deviation + remaining) / total <= self.threshold
+        return cheating or clean
+
+
+def record_cv_stage_metrics(total_seconds, infer_seconds, frames_scanned, frames_inferred):
+    """
+    Metrik tahap CV: waktu decode (menunggu frame dari OpenCV/ffmpeg) vs inferensi YOLO,
+    jumlah frame yang dilewati decoder vs frame yang diinferensi, dan throughput inferensi.
+    """
+    record_stage("cv", total_seconds)
+    record_stage("cv_decode", max(0.0, total_seconds - infer_seconds))
+    record_stage("cv_inference", infer_seconds)
+    METRICS.inc("cv_frames_scanned_total", frames_scanned)
+    METRICS.inc("cv_frames_inferred_total", frames_inferred)
+    if frames_inferred and infer_seconds > 0:
+        METRICS.observe("cv_inference_fps", frames_inferred / infer_seconds)
+
+
 # ================= MAIN CV ASSESSMENT FUNCTION =================
-def run_cv_assessment(video_path):
+def run_cv_assessment(video_path, batch_size=None, sample_fps=None, sampling_mode=None, return_timeline=False,
+                      frames=None, adaptive=None, frame_count=None, source_fps=None):
     """
     Memproses video untuk menghitung rasio frame yang tidak melihat ke depan.
+    batch_size > 1 mengumpulkan frame sampel dan menjalankan YOLO per batch
+    (default CV_BATCH_SIZE); batch_size = 1 menjalankan YOLO per frame.
+    sample_fps / sampling_mode mengatur pemilihan frame (default CV_SAMPLE_FPS / CV_SAMPLING_MODE).
+    return_timeline=True menambahkan timeline gaze per frame sampel ke hasil.
+    frames: iterator (frame_index, timestamp_ms, frame) yang sudah disampling (mis. dari
+    media_ingest.MediaIngest); jika diberikan, video tidak dibuka ulang dengan OpenCV. MediaIngestError
+    dari iterator tersebut diteruskan ke pemanggil (bukan dilaporkan sebagai kecurangan).
+    frame_count / source_fps: metadata video untuk iterator frames (mis. dari probe MediaIngest),
+    dipakai mode adaptif untuk memperkirakan jumlah frame sampel.
+    adaptive=True (default CV_ADAPTIVE) memakai AdaptiveGazeSampler: inferensi jarang saat gaze stabil dan
+    pemindaian dapat berhenti lebih awal; hasil ditambah decision_confidence dan ringkasan sampling
+    (termasuk ratio_bounds). Setelah early exit, eye_movement_ratio hanya mencakup bagian yang dipindai
+    (eye_movement_ratio_partial=True) dan violations dihitung dari batas bawah ratio_bounds.
     """
+    if adaptive is None:
+        adaptive = CV_ADAPTIVE
+    if batch_size is None:
+        batch_size = CV_BATCH_SIZE
+    if sample_fps is None:
+        sample_fps = CV_SAMPLE_FPS
+    if sampling_mode is None:
+        sampling_mode = CV_SAMPLING_MODE
+
     # Penanganan error yang spesifik
-    if POSE_MODEL is None:
+    if get_pose_model() is None:
         return {
             "eye_movement_ratio": 1.0, 
             "cheating_flag": True,
@@ -87,65 +526,70 @@ def run_cv_assessment(video_path):
             "error": "CV Model (YOLO-Pose) failed to initialize due to missing model file or dependencies."
         }
         
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        return {
-            "eye_movement_ratio": 1.0,
-            "cheating_flag": True,
-            "violations": 1,
-            "error": "Failed to open video file."
-        }
+    stage_start = time.perf_counter()
+    cap = None
+    expected_samples = None
+    if frames is None:
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            return {
+                "eye_movement_ratio": 1.0,
+                "cheating_flag": True,
+                "violations": 1,
+                "error": "Failed to open video file."
+            }
+        # OPTIMASI: Hanya frame sampel yang di-decode penuh; frame lain di-grab atau dilompati
+        frames = iter_sampled_frames(
+            cap, frame_step=FRAME_SKIP_RATE, sample_fps=sample_fps, mode=sampling_mode
+        )
+        if adaptive:
+            expected_samples = expected_sample_count(cap.get(cv2.CAP_PROP_FRAME_COUNT), get_source_fps(cap), sample_fps)
+    elif adaptive and source_fps:
+        # Frame dari ffmpeg: metadata berasal dari probe ingest, container tidak dibuka lagi
+        expected_samples = expected_sample_count(frame_count, source_fps, sample_fps)
 
-    total_frames = 0
-    away_gaze_frames = 0
-    processed_frames_count = 0
+    batch_size = max(1, batch_size)
+    keypoint_batches = []
+    frame_indices = []
+    timestamps_ms = []
+    pending_frames = []
+    infer_seconds = 0.0
+    sampler = None
+    tracker = new_face_tracker()
     
     try:
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            total_frames += 1
+        if adaptive:
+            # OPTIMASI: Berhenti memindai begitu sisa video tidak dapat lagi mengubah keputusan integritas
+            sampler = AdaptiveGazeSampler(expected_samples, batch_size=batch_size, tracker=tracker).run(frames)
+            frame_indices, timestamps_ms = sampler.frame_indices, sampler.timestamps_ms
+            if sampler.keypoints:
+                keypoint_batches.append(np.stack(sampler.keypoints))
+            infer_seconds = sampler.infer_seconds
+        else:
+            for frame_index, timestamp_ms, frame in frames:
+                frame_indices.append(frame_index)
+                timestamps_ms.append(timestamp_ms)
 
-            # OPTIMASI: Lewati beberapa frame untuk kecepatan (Sampling)
-            if total_frames % FRAME_SKIP_RATE != 0:
-                continue
-            
-            processed_frames_count += 1
-
-            # YOLO Pose Inference
-            # Mode 'stream=True' dapat meningkatkan throughput
-            results = POSE_MODEL(frame, verbose=False, device=CV_DEVICE, stream=True)
-
-            for r in results:
-                # Hanya memproses hasil dari orang pertama yang terdeteksi
-                if r.keypoints is None or len(r.keypoints.xy) == 0:
-                    continue
-                
-                # Ambil keypoints dari orang pertama yang terdeteksi
-                keypoints = r.keypoints.xy[0].cpu().numpy() 
-                
-                if len(keypoints) < 3:
-                    continue
-
-                kp = {
-                    NOSE_KP_ID: keypoints[NOSE_KP_ID],
-                    RIGHT_EYE_KP_ID: keypoints[RIGHT_EYE_KP_ID],
-                    LEFT_EYE_KP_ID: keypoints[LEFT_EYE_KP_ID],
-                }
-
-                gaze, conf = get_gaze_direction(kp)
-
-                # Hitung frame 'away' hanya pada frame yang di-sampling dan memiliki confidence tinggi
-                if gaze != "Looking Forward" and conf > 0.5: 
-                    away_gaze_frames += 1
-                
-                # KELUAR dari loop 'for r in results' setelah mendeteksi orang pertama
-                break 
+                # OPTIMASI: Kumpulkan frame sampel lalu jalankan YOLO sekali per batch
+                pending_frames.append(frame)
+                if len(pending_frames) >= batch_size:
+                    batch_start = time.perf_counter()
+                    keypoint_batches.append(infer_keypoints_batch(pending_frames, tracker))
+                    infer_seconds += time.perf_counter() - batch_start
+                    pending_frames = []
+
+            # Sisa frame yang belum memenuhi satu batch penuh
+            if pending_frames:
+                batch_start = time.perf_counter()
+                keypoint_batches.append(infer_keypoints_batch(pending_frames, tracker))
+                infer_seconds += time.perf_counter() - batch_start
     
+    except MediaIngestError:
+        # Frame dari ffmpeg tidak tersedia: bukan bukti kecurangan, pemanggil mengulang dengan OpenCV
+        raise
     except Exception as e:
         traceback.print_exc()
+        METRICS.inc("stage_errors_total", stage="cv")
         return {
             "eye_movement_ratio": 1.0,
             "cheating_flag": True,
@@ -153,8 +597,15 @@ def run_cv_assessment(video_path):
             "error": f"CV Runtime Error: {str(e)}"
         }
     finally:
-        cap.release()
+        if cap is not None:
+            cap.release()
     
+    processed_frames_count = len(frame_indices)
+    if sampler is not None:
+        frames_scanned = sampler.frames_scanned
+    else:
+        frames_scanned = frame_indices[-1] + 1 if frame_indices else 0
+    record_cv_stage_metrics(time.perf_counter() - stage_start, infer_seconds, frames_scanned, processed_frames_count)
     if processed_frames_count == 0:
         return {
             "eye_movement_ratio": 0.0,
@@ -163,18 +614,41 @@ def run_cv_assessment(video_path):
             "error": "Video too short or no face detected in sampled frames."
         }
 
-    not_looking_ratio = (away_gaze_frames / processed_frames_count)
+    # OPTIMASI: Gaze seluruh frame sampel dihitung sekaligus secara vektor
+    gaze = compute_gaze_batch(np.concatenate(keypoint_batches))
+    # Mode adaptif: estimasi dari blok subsampel (rasio mentah frame yang diinferensi bias ke sekitar perubahan)
+    not_looking_ratio = sampler.eye_movement_ratio if sampler is not None else gaze["eye_movement_ratio"]
     
     # Logika Penentuan Kecurangan
     # Jika ratio > 20% (dapat disesuaikan) dianggap potensi curang
-    INTEGRITY_THRESHOLD = 0.20
     is_cheating = not_looking_ratio > INTEGRITY_THRESHOLD
     # Violations sebanding dengan rasio pergerakan mata, dibulatkan ke atas
     violations_count = math.ceil(not_looking_ratio * 10) 
+    if sampler is not None:
+        ratio_low, ratio_high = sampler.ratio_bounds
+        if sampler.early_exit:
+            # Early exit: rasio di atas hanya mencakup bagian yang dipindai; violations memakai batas bawah
+            # rasio seluruh video (ratio_bounds), bukan rasio bagian awal
+            violations_count = math.ceil(ratio_low * 10)
 
-    return {
+    result = {
         "eye_movement_ratio": round(not_looking_ratio, 2),
         "cheating_flag": is_cheating,
         "violations": violations_count,
         "error": None
-    }
\ No newline at end of file
+    }
+    if sampler is not None:
+        result["eye_movement_ratio_partial"] = sampler.early_exit
+        result["decision_confidence"] = round(sampler.decision_confidence, 4)
+        result["sampling"] = {
+            "mode": sampler.mode,
+            "frames_scanned": frames_scanned,
+            "frames_inferred": processed_frames_count,
+            "expected_samples": sampler.expected_samples,
+            "early_exit": sampler.early_exit,
+            # Dibulatkan ke luar agar rentang tetap mencakup rasio sebenarnya
+            "ratio_bounds": [math.floor(ratio_low * 1e4) / 1e4, math.ceil(ratio_high * 1e4) / 1e4],
+        }
+    if return_timeline:
+        result["timeline"] = build_gaze_timeline(frame_indices, timestamps_ms, gaze)
+    return result
\ No newline at end of file
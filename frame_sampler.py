@@ -0,0 +1,86 @@
+import cv2
+
+# ========================= KONFIGURASI SAMPLING =========================
+# read : decode + konversi setiap frame, lalu buang frame yang tidak disampling (perilaku lama)
+# grab : frame yang dilewati hanya di-grab (tanpa retrieve/konversi warna), frame sampel di-read
+# seek : lompat langsung ke frame sampel dengan CAP_PROP_POS_FRAMES (efektif untuk sampling jarang)
+SAMPLING_MODES = ("read", "grab", "seek")
+DEFAULT_SOURCE_FPS = 30.0 # Dipakai jika container tidak menyimpan informasi fps
+
+
+def get_source_fps(cap):
+    """Mengembalikan fps video, atau DEFAULT_SOURCE_FPS jika tidak tersedia."""
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    if not fps or fps != fps or fps <= 0: # fps != fps menangkap NaN
+        return DEFAULT_SOURCE_FPS
+    return fps
+
+
+def iter_target_indices(source_fps, frame_step=None, sample_fps=None):
+    """
+    Menghasilkan indeks frame (0-based) yang akan dianalisis, tanpa batas akhir.
+
+    - frame_step: ambil 1 dari setiap N frame (frame ke-N, 2N, ... seperti FRAME_SKIP_RATE).
+    - sample_fps: ambil N frame per detik video, berapa pun fps sumbernya.
+    """
+    if sample_fps:
+        # Frame sampel ke-k berada pada detik k / sample_fps
+        interval = source_fps / float(sample_fps)
+        k = 0
+        last = -1
+        while True:
+            index = int(round(k * interval))
+            k += 1
+            if index > last: # Jika sample_fps > fps sumber, jangan ambil frame yang sama dua kali
+                last = index
+                yield index
+    else:
+        step = max(1, int(frame_step or 1))
+        index = step - 1
+        while True:
+            yield index
+            index += step
+
+
+def count_target_frames(frame_count, source_fps, frame_step=None, sample_fps=None):
+    """Jumlah indeks dari iter_target_indices yang berada di dalam video berisi frame_count frame."""
+    if not sample_fps:
+        return frame_count // max(1, int(frame_step or 1))
+    count = 0
+    for index in iter_target_indices(source_fps, sample_fps=sample_fps):
+        if index >= frame_count:
+            return count
+        count += 1
+
+
+def iter_sampled_frames(cap, frame_step=None, sample_fps=None, mode="grab"):
+    """
+    Membaca frame sampel dari cv2.VideoCapture yang sudah terbuka.
+    Menghasilkan tuple (frame_index, timestamp_ms, frame).
+    """
+    if mode not in SAMPLING_MODES:
+        raise ValueError(f"Unknown sampling mode '{mode}'. Use one of {SAMPLING_MODES}.")
+
+    source_fps = get_source_fps(cap)
+    position = 0 # Indeks frame berikutnya yang akan dibaca oleh decoder
+
+    for target in iter_target_indices(source_fps, frame_step, sample_fps):
+        if mode == "seek":
+            if target != position:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+        else:
+            while position < target:
+                if mode == "grab":
+                    ok = cap.grab()
+                else:
+                    ok, _ = cap.read()
+                if not ok:
+                    return
+                position += 1
+
+        ok, frame = cap.read()
+        if not ok:
+            return
+        position = target + 1
+
+        yield target, target / source_fps * 1000.0, frame
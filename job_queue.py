@@ -0,0 +1,153 @@
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# ========================= KONFIGURASI DEFAULT =========================
+DEFAULT_JOB_WORKERS = 2          # Jumlah pipeline yang berjalan bersamaan
+DEFAULT_MAX_PENDING_JOBS = 32    # Batas job (antri + berjalan) sebelum menolak upload baru
+DEFAULT_JOB_TTL_SECONDS = 3600   # Job selesai disimpan selama 1 jam agar masih bisa di-poll
+
+
+class JobQueueFull(Exception):
+    """Dilempar ketika antrian job sudah mencapai batas maksimum."""
+
+
+class JobQueue:
+    """
+    Antrian job lokal dengan worker pool terbatas.
+
+    Setiap job menerima callback `progress(stage, status, detail=None)` sebagai keyword argument
+    sehingga status per tahap (mis. stt/cv/llm) dapat di-poll oleh client. Setiap panggilan
+    juga dicatat sebagai event (mis. transkrip parsial) yang dapat dialirkan lewat wait_for_events.
+
+    record_store (opsional, mis. job_store.JobRecordStore): setiap perubahan status disalin ke sana
+    dan get() membaca dari sana untuk job milik proses lain (deployment multi-worker).
+    """
+
+    def __init__(self, max_workers=DEFAULT_JOB_WORKERS, max_pending=DEFAULT_MAX_PENDING_JOBS,
+                 ttl_seconds=DEFAULT_JOB_TTL_SECONDS, record_store=None):
+        self.max_pending = max_pending
+        self.ttl_seconds = ttl_seconds
+        self.record_store = record_store
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+
+    def submit(self, func, *args, stages=(), owner=None, **kwargs):
+        """Mendaftarkan job baru dan mengembalikan job_id tanpa menunggu hasilnya."""
+        with self._lock:
+            self._purge_expired()
+            active = sum(1 for job in self._jobs.values() if job["status"] in ("queued", "running"))
+            if active >= self.max_pending:
+                raise JobQueueFull(f"Job queue is full ({active}/{self.max_pending} active jobs).")
+
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "owner": owner,
+                "status": "queued",
+                "stages": {stage: "pending" for stage in stages},
+                "result": None,
+                "error": None,
+                "events": [],
+                "created_at": time.time(),
+                "finished_at": None,
+            }
+
+        if self.record_store is not None:
+            self.record_store.purge_expired()
+        self._persist(job_id)
+        self._executor.submit(self._run, job_id, func, args, kwargs)
+        return job_id
+
+    def get(self, job_id):
+        """Mengembalikan salinan status job, atau None jika job tidak dikenal/kedaluwarsa."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return self._snapshot(job)
+        # Job dijalankan oleh proses worker lain
+        return self.record_store.get(job_id) if self.record_store is not None else None
+
+    def update(self, job_id, **fields):
+        """Memperbarui field job secara atomik (mis. menandai hasil sudah disimpan)."""
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+                self._changed.notify_all()
+        self._persist(job_id)
+
+    def wait_for_events(self, job_id, since=0, timeout=15.0):
+        """
+        Menunggu event baru (indeks >= since) atau job selesai, paling lama `timeout` detik.
+        Mengembalikan (events_baru, status_job), atau (None, None) jika job tidak dikenal.
+        """
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while True:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    return None, None
+                finished = job["status"] in ("done", "failed")
+                remaining = deadline - time.monotonic()
+                if len(job["events"]) > since or finished or remaining <= 0:
+                    return list(job["events"][since:]), self._snapshot(job)
+                self._changed.wait(remaining)
+
+    # ----------------------------- INTERNAL -----------------------------
+    @staticmethod
+    def _snapshot(job):
+        snapshot = {key: value for key, value in job.items() if key != "events"}
+        snapshot["stages"] = dict(job["stages"])
+        return snapshot
+
+    def _progress(self, job_id, stage, status, detail=None):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                # Status "partial" hanya event tambahan, bukan perubahan status tahap
+                if status != "partial":
+                    job["stages"][stage] = status
+                job["events"].append({"stage": stage, "status": status, **(detail or {})})
+                self._changed.notify_all()
+        if status != "partial":
+            self._persist(job_id)
+
+    def _persist(self, job_id):
+        # Snapshot diambil dengan lock, ditulis ke record_store di luar lock
+        if self.record_store is None:
+            return
+        with self._lock:
+            job = self._jobs.get(job_id)
+            snapshot = self._snapshot(job) if job is not None else None
+        if snapshot is not None:
+            try:
+                self.record_store.save(snapshot)
+            except Exception:
+                traceback.print_exc() # Gagal menyalin status tidak boleh menggagalkan job
+
+    def _run(self, job_id, func, args, kwargs):
+        self.update(job_id, status="running")
+        try:
+            result = func(
+                *args,
+                progress=lambda stage, status, detail=None: self._progress(job_id, stage, status, detail),
+                **kwargs
+            )
+            self.update(job_id, status="done", result=result, finished_at=time.time())
+        except Exception as e:
+            traceback.print_exc()
+            self.update(job_id, status="failed", error=str(e), finished_at=time.time())
+
+    def _purge_expired(self):
+        # Dipanggil dengan lock sudah dipegang
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job["finished_at"] is not None and now - job["finished_at"] > self.ttl_seconds
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
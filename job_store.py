@@ -0,0 +1,64 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# ========================= KONFIGURASI DEFAULT =========================
+DEFAULT_TTL_SECONDS = 3600  # Sama dengan JOB_TTL_SECONDS default: job selesai dapat di-poll selama 1 jam
+
+
+class JobRecordStore:
+    """
+    Salinan status job (SQLite) yang dapat dibaca oleh semua proses worker web di host yang sama.
+
+    JobQueue tetap menjalankan job dan menyimpan event di memori prosesnya; setiap perubahan status
+    ditulis ke sini sehingga GET /api/jobs/<job_id> tetap berhasil meskipun request polling
+    ditangani worker lain (deployment multi-worker, lihat serve.py).
+    """
+
+    def __init__(self, path, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS job_records (
+                job_id TEXT PRIMARY KEY,
+                record TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_job_records_updated ON job_records (updated_at)")
+        self._conn.commit()
+
+    def save(self, job):
+        """Menyimpan (atau mengganti) snapshot job dari JobQueue."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO job_records (job_id, record, updated_at) VALUES (?, ?, ?)",
+                (job["job_id"], json.dumps(job), time.time()),
+            )
+            self._conn.commit()
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute("SELECT record FROM job_records WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def purge_expired(self):
+        """Menghapus job yang tidak diperbarui lebih lama dari ttl_seconds."""
+        with self._lock:
+            self._conn.execute("DELETE FROM job_records WHERE updated_at < ?", (time.time() - self.ttl_seconds,))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,164 @@
+import asyncio
+import random
+import threading
+import time
+
+import httpx
+
+# ========================= KONFIGURASI DEFAULT =========================
+DEFAULT_MAX_CONCURRENCY = 4       # Panggilan Gemini yang boleh berjalan bersamaan
+DEFAULT_TIMEOUT_SECONDS = 20.0    # Batas waktu satu percobaan
+DEFAULT_DEADLINE_SECONDS = 45.0   # Batas waktu total (termasuk antri, retry dan backoff)
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_BACKOFF_SECONDS = 0.5     # Backoff eksponensial: 0.5s, 1s, 2s, ... (dengan jitter)
+DEFAULT_BREAKER_FAILURES = 5      # Kegagalan beruntun sebelum circuit dibuka
+DEFAULT_BREAKER_RESET_SECONDS = 30.0
+
+
+class CircuitOpenError(Exception):
+    """Dilempar tanpa memanggil API ketika circuit breaker sedang terbuka."""
+
+
+class LLMDeadlineExceeded(Exception):
+    """Dilempar ketika batas waktu total panggilan LLM habis."""
+
+
+def build_gemini_client(base_url=None, max_connections=DEFAULT_MAX_CONCURRENCY):
+    """
+    Membuat klien Gemini dengan pool koneksi HTTP terbatas (keep-alive dipakai ulang antar panggilan).
+    base_url: alamat API alternatif, mis. server palsu lokal (tools/fake_gemini_server.py).
+    """
+    import google.genai as genai_module # Import SDK (~0.5 detik) hanya jika klien benar-benar dibuat
+
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    http_options = {"async_client_args": {"limits": limits}}
+    if base_url:
+        http_options["base_url"] = base_url
+    return genai_module.Client(http_options=http_options)
+
+
+def is_retryable(error):
+    """Timeout, error jaringan, rate limit (429) dan error server (5xx) layak dicoba ulang."""
+    from google.genai import errors as genai_errors
+
+    if isinstance(error, genai_errors.APIError):
+        return error.code == 429 or error.code >= 500
+    return isinstance(error, (asyncio.TimeoutError, httpx.TransportError, ConnectionError))
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker sederhana: setelah `failure_threshold` kegagalan beruntun, semua panggilan
+    langsung ditolak selama `reset_seconds`; setelah itu satu panggilan percobaan diizinkan
+    (half-open) untuk menentukan apakah circuit ditutup kembali.
+    """
+
+    def __init__(self, failure_threshold=DEFAULT_BREAKER_FAILURES, reset_seconds=DEFAULT_BREAKER_RESET_SECONDS):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_seconds:
+                return "half-open"
+            return "open"
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_seconds or self._probing:
+                return False
+            self._probing = True # Hanya satu panggilan percobaan saat half-open
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+
+class AsyncLLMClient:
+    """
+    Backend LLM berbasis asyncio untuk dipanggil dari thread Flask/worker.
+
+    Satu event loop berjalan di thread background dan memakai klien async Gemini (client.aio)
+    yang sama untuk semua request, sehingga koneksi HTTP dipakai ulang. Setiap panggilan:
+    - menunggu slot semaphore (maksimal `max_concurrency` panggilan bersamaan),
+    - dibatasi `timeout_seconds` per percobaan dan `deadline_seconds` secara total,
+    - dicoba ulang dengan backoff eksponensial + jitter untuk error sementara (429/5xx/timeout),
+    - ditolak langsung (CircuitOpenError) jika circuit breaker terbuka.
+    """
+
+    def __init__(self, genai_client, max_concurrency=DEFAULT_MAX_CONCURRENCY, timeout_seconds=DEFAULT_TIMEOUT_SECONDS,
+                 deadline_seconds=DEFAULT_DEADLINE_SECONDS, max_attempts=DEFAULT_MAX_ATTEMPTS,
+                 backoff_seconds=DEFAULT_BACKOFF_SECONDS, breaker=None):
+        self.genai_client = genai_client
+        self.timeout_seconds = timeout_seconds
+        self.deadline_seconds = deadline_seconds
+        self.max_attempts = max(1, int(max_attempts))
+        self.backoff_seconds = backoff_seconds
+        self.breaker = breaker or CircuitBreaker()
+        self._semaphore = asyncio.Semaphore(max(1, int(max_concurrency)))
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="llm-client", daemon=True)
+        self._thread.start()
+
+    def generate_content(self, **kwargs):
+        """Versi blocking dari client.models.generate_content dengan timeout, retry dan circuit breaker."""
+        if not self.breaker.allow():
+            raise CircuitOpenError("LLM circuit breaker is open; skipping API call")
+        deadline = time.monotonic() + self.deadline_seconds
+        future = asyncio.run_coroutine_threadsafe(self._generate_with_retries(kwargs, deadline), self._loop)
+        return future.result()
+
+    def close(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    # ----------------------------- INTERNAL -----------------------------
+    async def _generate_with_retries(self, kwargs, deadline):
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                async with self._semaphore:
+                    # Waktu menunggu slot ikut mengurangi sisa deadline
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise LLMDeadlineExceeded(f"LLM deadline of {self.deadline_seconds}s exceeded")
+                    timeout = min(self.timeout_seconds, remaining)
+                    try:
+                        response = await asyncio.wait_for(
+                            self.genai_client.aio.models.generate_content(**kwargs), timeout=timeout
+                        )
+                    except asyncio.TimeoutError:
+                        raise asyncio.TimeoutError(f"LLM call timed out after {timeout:.1f}s") from None
+                self.breaker.record_success()
+                return response
+            except Exception as e:
+                retryable = is_retryable(e)
+                delay = self.backoff_seconds * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+                if not retryable or attempt >= self.max_attempts or time.monotonic() + delay >= deadline:
+                    # Error permintaan (4xx selain 429) bukan tanda API bermasalah
+                    if retryable or isinstance(e, LLMDeadlineExceeded):
+                        self.breaker.record_failure()
+                    else:
+                        self.breaker.record_success()
+                    raise
+                await asyncio.sleep(delay)
@@ -0,0 +1,93 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+# ========================= KONFIGURASI DEFAULT =========================
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL_SECONDS = 3600
+
+
+class CoalescingMemo:
+    """
+    Memoization in-memory (LRU + TTL) dengan penggabungan request identik yang sedang berjalan.
+
+    get_or_compute(key, compute): jika key sudah ada dan belum kedaluwarsa, hasil langsung dikembalikan;
+    jika key yang sama sedang dihitung oleh thread lain, pemanggil menunggu hasil yang sama
+    (compute hanya dipanggil sekali). Exception dari compute diteruskan ke semua pemanggil
+    yang menunggu dan TIDAK disimpan, sehingga panggilan berikutnya akan mencoba lagi.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict() # key -> (value, waktu_disimpan)
+        self._inflight = {}           # key -> Future milik thread yang sedang menghitung
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                if time.monotonic() - stored_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._inflight[key]
+            self._store(key, value)
+        future.set_result(value)
+        return value
+
+    def peek(self, key):
+        """Mengembalikan nilai tersimpan (tanpa menghitung), atau None jika tidak ada/kedaluwarsa."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[1] > self.ttl_seconds:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """Menyimpan nilai yang dihitung di luar get_or_compute (mis. hasil penilaian batch)."""
+        with self._lock:
+            self._store(key, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    # ----------------------------- INTERNAL -----------------------------
+    def _store(self, key, value):
+        # Dipanggil dengan lock sudah dipegang; entri yang paling lama tidak dipakai dibuang lebih dulu
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
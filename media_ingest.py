@@ -0,0 +1,276 @@
+import functools
+import os
+import queue
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+
+import cv2
+import numpy as np
+
+# ========================= KONFIGURASI INGEST =========================
+AUDIO_SAMPLE_RATE = 16000 # Whisper mengharapkan audio mono 16 kHz
+AUDIO_READ_BYTES = 64 * 1024
+DEFAULT_SOURCE_FPS = 30.0 # Sama dengan frame_sampler.DEFAULT_SOURCE_FPS
+
+
+class MediaIngestError(Exception):
+    """Dilempar ketika ffmpeg gagal men-demux/decode file upload."""
+
+
+def find_ffmpeg():
+    """Mengembalikan path binary ffmpeg (FFMPEG_BINARY atau PATH), atau None jika tidak ada."""
+    return os.environ.get("FFMPEG_BINARY") or shutil.which("ffmpeg")
+
+
+@functools.lru_cache(maxsize=None)
+def passthrough_vsync_args(ffmpeg_binary):
+    """
+    Opsi agar ffmpeg tidak menduplikasi/membuang frame hasil filter select.
+    -fps_mode baru ada sejak ffmpeg 5.1; versi lama (mis. 4.4 di Ubuntu 22.04) hanya mengenal -vsync.
+    Build git/tidak dikenal dianggap versi baru. Diperiksa sekali per binary.
+    """
+    try:
+        version = subprocess.run(
+            [ffmpeg_binary, "-hide_banner", "-version"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        ).stdout.decode(errors="replace")
+    except OSError:
+        version = ""
+    match = re.search(r"ffmpeg version n?(\d+)\.(\d+)", version)
+    if match and (int(match.group(1)), int(match.group(2))) < (5, 1):
+        return ["-vsync", "passthrough"]
+    return ["-fps_mode", "passthrough"]
+
+
+class MediaIngest:
+    """
+    Decode file upload dengan ffmpeg untuk STT dan CV tanpa librosa/OpenCV.
+
+    - Audio: proses ffmpeg audio-only (-vn) me-resample ke 16 kHz mono float32; dibaca di thread
+      terpisah, dapat diambil sekaligus (read_audio) atau per potongan saat tiba (audio_chunks).
+    - Frame sampel: proses ffmpeg terpisah mengalirkan PPM melalui stdout dan dibaca satu per satu
+      (untuk CV), sehingga tidak ada consumer yang menyimpan seluruh video hasil decode di memori.
+
+    Kedua proses independen: STT bisa selesai tanpa menunggu CV menghabiskan frame.
+    audio=False / video=False melewati proses yang tidak dibutuhkan (mis. hasil CV sudah di-cache).
+    close() wajib dipanggil di akhir.
+    """
+
+    def __init__(self, video_path, frame_step=None, sample_fps=None, ffmpeg_binary=None, audio=True, video=True):
+        self.video_path = video_path
+        self.frame_step = max(1, int(frame_step or 1))
+        self.sample_fps = sample_fps
+        self.ffmpeg_binary = ffmpeg_binary or find_ffmpeg()
+        self.want_audio = audio
+        self.want_video = video
+        self._video_process = None
+        self._audio_process = None
+        self._audio_thread = None
+        self._audio_queue = queue.Queue()
+        self._audio_error = None
+        self._video_stderr = None
+        self._audio_stderr = None
+        self._source_fps = DEFAULT_SOURCE_FPS
+        self._duration_seconds = None
+        self._has_audio = False
+
+    # ----------------------------- LIFECYCLE -----------------------------
+    def start(self):
+        if not self.ffmpeg_binary:
+            raise MediaIngestError("ffmpeg binary not found. Set FFMPEG_BINARY or add ffmpeg to PATH.")
+
+        self._probe_streams()
+        base = [self.ffmpeg_binary, "-hide_banner", "-nostdin", "-v", "error", "-i", self.video_path]
+
+        if self.want_audio and self._has_audio:
+            # Audio dimulai lebih dulu agar STT bisa langsung berjalan
+            self._audio_stderr = tempfile.TemporaryFile()
+            self._audio_process = subprocess.Popen(
+                base + ["-vn", "-map", "0:a:0", "-ac", "1", "-ar", str(AUDIO_SAMPLE_RATE), "-f", "f32le", "pipe:1"],
+                stdout=subprocess.PIPE, stderr=self._audio_stderr,
+            )
+            self._audio_thread = threading.Thread(target=self._read_audio_pipe, name="ingest-audio", daemon=True)
+            self._audio_thread.start()
+
+        if self.want_video:
+            if self.sample_fps:
+                # Sampling berbasis waktu: indeks frame dihitung dari fps sumber
+                video_filter = f"fps={self.sample_fps}"
+            else:
+                # Ambil frame ke-N, 2N, ... (indeks 0-based N-1, 2N-1, ...) seperti FRAME_SKIP_RATE
+                video_filter = f"select=not(mod(n+1\\,{self.frame_step}))"
+            self._video_stderr = tempfile.TemporaryFile()
+            self._video_process = subprocess.Popen(
+                base + ["-an", "-map", "0:v:0", "-vf", video_filter, *passthrough_vsync_args(self.ffmpeg_binary),
+                        "-f", "image2pipe", "-c:v", "ppm", "pipe:1"],
+                stdout=subprocess.PIPE, stderr=self._video_stderr,
+            )
+        return self
+
+    def close(self):
+        """Menghentikan proses ffmpeg yang masih berjalan dan membersihkan file sementara."""
+        for process in (self._video_process, self._audio_process):
+            if process is not None:
+                if process.poll() is None:
+                    process.kill()
+                process.wait()
+                process.stdout.close()
+        if self._audio_thread is not None:
+            self._audio_thread.join()
+        for stderr_file in (self._video_stderr, self._audio_stderr):
+            if stderr_file is not None:
+                stderr_file.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # ----------------------------- CONSUMERS -----------------------------
+    @property
+    def has_video(self):
+        return self._video_process is not None
+
+    @property
+    def source_fps(self):
+        return self._source_fps
+
+    @property
+    def frame_count(self):
+        """Perkiraan jumlah frame (durasi container x fps dari probe), atau None jika durasi tidak ada."""
+        if self._duration_seconds is None:
+            return None
+        return int(round(self._duration_seconds * self._source_fps))
+
+    def frames(self):
+        """
+        Menghasilkan tuple (frame_index, timestamp_ms, frame_bgr) untuk setiap frame sampel,
+        format yang sama dengan frame_sampler.iter_sampled_frames.
+        Melempar MediaIngestError jika ffmpeg gagal sebelum menghasilkan satu frame pun.
+        """
+        if self._video_process is None:
+            raise MediaIngestError("Video decoding was not started for this ingest.")
+        produced = 0
+        returncode = None
+        try:
+            while True:
+                frame = self._read_ppm_frame()
+                if frame is None:
+                    break
+                if self.sample_fps:
+                    timestamp_ms = produced / float(self.sample_fps) * 1000.0
+                    frame_index = int(round(timestamp_ms / 1000.0 * self._source_fps))
+                else:
+                    frame_index = (produced + 1) * self.frame_step - 1
+                    timestamp_ms = frame_index / self._source_fps * 1000.0
+                produced += 1
+                yield frame_index, timestamp_ms, frame
+            returncode = self._video_process.wait() # stdout habis: ffmpeg sudah/hampir selesai
+        finally:
+            # Consumer berhenti lebih awal (error atau early-exit): hentikan decode sisa video
+            self.release_frames()
+
+        if produced == 0 and returncode != 0:
+            raise MediaIngestError(f"ffmpeg failed to decode video: {self._stderr_text(self._video_stderr)}")
+
+    def release_frames(self):
+        """Menghentikan decode frame yang tidak lagi dibutuhkan (tidak memengaruhi audio)."""
+        if self._video_process is not None and self._video_process.poll() is None:
+            self._video_process.kill()
+
+    def audio_chunks(self):
+        """
+        Menghasilkan potongan audio float32 16 kHz segera setelah di-decode (untuk STT streaming).
+        Hanya boleh ada satu consumer audio (audio_chunks atau read_audio) per ingest.
+        """
+        if not self._has_audio:
+            raise MediaIngestError("Video file has no audio stream.")
+        if self._audio_process is None:
+            raise MediaIngestError("Audio decoding was not started for this ingest.")
+
+        remainder = b""
+        produced = False
+        for data in self._iter_audio_bytes():
+            data = remainder + data
+            # Sampel float32 bisa terpotong di batas chunk; sisanya digabung ke chunk berikutnya
+            usable = len(data) - len(data) % 4
+            remainder = data[usable:]
+            if usable:
+                produced = True
+                yield np.frombuffer(data[:usable], dtype=np.float32)
+
+        if not produced:
+            self._audio_process.wait()
+            raise MediaIngestError(f"ffmpeg failed to decode audio: {self._stderr_text(self._audio_stderr)}")
+
+    def read_audio(self):
+        """Menunggu hingga seluruh audio selesai di-decode, lalu mengembalikan array float32 16 kHz."""
+        return np.concatenate(list(self.audio_chunks()))
+
+    # ----------------------------- INTERNAL -----------------------------
+    def _iter_audio_bytes(self):
+        while True:
+            chunk = self._audio_queue.get()
+            if chunk is None:
+                break
+            yield chunk
+        if self._audio_error is not None:
+            raise MediaIngestError(f"Failed to read audio stream: {self._audio_error}")
+
+    def _read_audio_pipe(self):
+        try:
+            pipe = self._audio_process.stdout
+            while True:
+                chunk = pipe.read(AUDIO_READ_BYTES)
+                if not chunk:
+                    break
+                self._audio_queue.put(chunk)
+        except Exception as e:
+            self._audio_error = e
+        finally:
+            self._audio_queue.put(None) # Penanda akhir stream
+
+    def _read_ppm_frame(self):
+        # Header PPM dari ffmpeg: b"P6\n<width> <height>\n255\n"
+        stdout = self._video_process.stdout
+        magic = stdout.readline()
+        if not magic:
+            return None
+        if magic.strip() != b"P6":
+            raise MediaIngestError(f"Unexpected frame header from ffmpeg: {magic[:16]!r}")
+        width, height = (int(v) for v in stdout.readline().split())
+        stdout.readline() # maxval (255)
+
+        size = width * height * 3
+        buffer = stdout.read(size)
+        if len(buffer) < size:
+            return None
+        rgb = np.frombuffer(buffer, dtype=np.uint8).reshape(height, width, 3)
+        return cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+
+    def _probe_streams(self):
+        # "ffmpeg -i" tanpa output hanya membaca header container (tanpa decode)
+        probe = subprocess.run(
+            [self.ffmpeg_binary, "-hide_banner", "-nostdin", "-i", self.video_path],
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        )
+        info = probe.stderr.decode(errors="replace")
+        if not re.search(r"Stream #\S+.*: Video:", info):
+            raise MediaIngestError(f"No video stream found in {self.video_path}: {info.strip()[-300:]}")
+        self._has_audio = re.search(r"Stream #\S+.*: Audio:", info) is not None
+        fps_match = re.search(r"Stream #\S+.*: Video:.*?([\d.]+) fps", info)
+        if fps_match and float(fps_match.group(1)) > 0:
+            self._source_fps = float(fps_match.group(1))
+        # Webm dari MediaRecorder browser tidak menyimpan durasi ("Duration: N/A")
+        duration_match = re.search(r"Duration: (\d+):(\d+):([\d.]+)", info)
+        if duration_match:
+            hours, minutes, seconds = duration_match.groups()
+            self._duration_seconds = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+    @staticmethod
+    def _stderr_text(stderr_file):
+        stderr_file.seek(0)
+        return stderr_file.read().decode(errors="replace").strip()[-500:]
@@ -0,0 +1,205 @@
+import bisect
+import contextvars
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource # Tidak tersedia di Windows
+except ImportError:
+    resource = None
+
+# ========================= KONFIGURASI DEFAULT =========================
+METRIC_PREFIX = "assessment_"
+# Bucket latensi (detik): dari operasi cache/upload kecil hingga video panjang
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+FPS_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+def _format_labels(labels, extra=None):
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in items) + "}"
+
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1) # Bucket terakhir = +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    Registry metrik in-process (counter, gauge, histogram) dengan output format teks Prometheus.
+
+    Metrik didaftarkan sekali lewat counter()/gauge()/histogram(), lalu diisi dengan inc()/set()/observe()
+    beserta label sebagai keyword argument. Thread-safe; setiap proses worker memiliki registry sendiri.
+    """
+
+    def __init__(self, prefix=METRIC_PREFIX):
+        self.prefix = prefix
+        self._definitions = {} # name -> (type, help, buckets)
+        self._values = {}      # name -> {label_tuple: float | _Histogram}
+        self._lock = threading.Lock()
+
+    def counter(self, name, help_text):
+        self._define(name, "counter", help_text)
+
+    def gauge(self, name, help_text):
+        self._define(name, "gauge", help_text)
+
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self._define(name, "histogram", help_text, buckets)
+
+    def inc(self, name, value=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._values[name]
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self._values[name][tuple(sorted(labels.items()))] = value
+
+    def observe(self, name, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._values[name]
+            if key not in series:
+                series[key] = _Histogram(self._definitions[name][2])
+            series[key].observe(value)
+
+    def render(self):
+        """Semua metrik dalam format teks Prometheus (text/plain; version=0.0.4)."""
+        lines = []
+        with self._lock:
+            for name, (kind, help_text, _) in self._definitions.items():
+                full_name = self.prefix + name
+                lines.append(f"# HELP {full_name} {help_text}")
+                lines.append(f"# TYPE {full_name} {kind}")
+                for labels, value in sorted(self._values[name].items()):
+                    if kind != "histogram":
+                        lines.append(f"{full_name}{_format_labels(labels)} {value}")
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(value.buckets + ("+Inf",), value.counts):
+                        cumulative += count
+                        lines.append(f"{full_name}_bucket{_format_labels(labels, ('le', bound))} {cumulative}")
+                    lines.append(f"{full_name}_sum{_format_labels(labels)} {value.total}")
+                    lines.append(f"{full_name}_count{_format_labels(labels)} {value.count}")
+        return "\n".join(lines) + "\n"
+
+    # ------ INTERNAL ------
+    def _define(self, name, kind, help_text, buckets=None):
+        with self._lock:
+            self._definitions[name] = (kind, help_text, buckets)
+            self._values.setdefault(name, {})
+
+
+# ========================= MEMORI PROSES =========================
+def peak_rss_bytes():
+    """Puncak resident set size proses ini (None jika tidak didukung OS)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024 # Linux melaporkan KiB
+
+
+def current_rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+# ========================= METRIK PIPELINE =========================
+METRICS = MetricsRegistry()
+METRICS.histogram("stage_seconds", "Latency per pipeline stage (upload, stt, cv, llm, ...).")
+METRICS.counter("stage_errors_total", "Stages that finished with an error result.")
+METRICS.counter("upload_bytes_total", "Bytes of uploaded video saved to disk.")
+METRICS.counter("stt_audio_seconds_total", "Seconds of audio transcribed by Whisper.")
+METRICS.counter("cv_frames_scanned_total", "Video frames the CV decoder passed through (decoded or skipped).")
+METRICS.counter("cv_frames_inferred_total", "Sampled frames sent to YOLO-Pose.")
+METRICS.histogram("cv_inference_fps", "YOLO-Pose throughput per video (inferred frames per second).", FPS_BUCKETS)
+METRICS.counter("llm_scoring_total", "LLM scoring calls by outcome (api, cache, memo, fallback, disabled).")
+METRICS.gauge("process_peak_rss_bytes", "Peak resident set size of this process.")
+METRICS.gauge("process_rss_bytes", "Current resident set size of this process.")
+
+
+def render_metrics():
+    """Output /metrics: metrik pipeline ditambah memori proses saat scrape."""
+    for name, value in (("process_peak_rss_bytes", peak_rss_bytes()), ("process_rss_bytes", current_rss_bytes())):
+        if value is not None:
+            METRICS.set(name, value)
+    return METRICS.render()
+
+
+# ========================= PROFIL PER REQUEST =========================
+# Profil aktif dibawa lewat contextvars; thread pool harus menjalankan tugas dengan
+# contextvars.copy_context().run agar tahap di thread lain tercatat ke request yang sama.
+_current_profile = contextvars.ContextVar("request_profile", default=None)
+
+
+class RequestProfile:
+    """Akumulasi durasi per tahap untuk satu request (dilaporkan lewat header Server-Timing)."""
+
+    def __init__(self):
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def server_timing(self):
+        with self._lock:
+            stages = list(self.stages.items())
+        entries = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in stages]
+        peak = peak_rss_bytes()
+        if peak is not None:
+            entries.append(f'peak_rss;desc="{peak / (1024 * 1024):.0f} MiB"')
+        return ", ".join(entries)
+
+
+def start_profile():
+    """Mengaktifkan profil untuk konteks saat ini. Mengembalikan (profile, token untuk stop_profile)."""
+    profile = RequestProfile()
+    return profile, _current_profile.set(profile)
+
+
+def stop_profile(token):
+    _current_profile.reset(token)
+
+
+def record_stage(stage, seconds):
+    """Mencatat durasi satu tahap ke histogram stage_seconds dan ke profil request yang aktif (jika ada)."""
+    METRICS.observe("stage_seconds", seconds, stage=stage)
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.add(stage, seconds)
+
+
+class timed_stage:
+    """Context manager: `with timed_stage("stt"): ...` mencatat durasi blok lewat record_stage."""
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.seconds = time.perf_counter() - self._start
+        record_stage(self.stage, self.seconds)
+        return False
@@ -0,0 +1,214 @@
+"""
+Model server lokal: satu proses per host yang memuat Whisper dan YOLO-Pose, dipakai bersama oleh
+semua worker web (gunicorn) lewat IPC (multiprocessing.connection).
+
+Worker web hanya mengirim path video (upload berada di filesystem yang sama) dan menerima hasil
+STT + CV; event progres dan transkrip parsial diteruskan selama pemrosesan. Dengan begitu memori
+model tidak berlipat sesuai jumlah worker, dan micro-batching Whisper (ASR_BATCH_SIZE) berlaku
+lintas worker. Biasanya dijalankan oleh serve.py; dapat juga dijalankan terpisah:
+
+    MODEL_SERVER_AUTHKEY=rahasia python model_server.py --address /tmp/assessment-model.sock
+    MODEL_SERVER_ADDRESS=/tmp/assessment-model.sock MODEL_SERVER_AUTHKEY=rahasia gunicorn app:app
+"""
+import argparse
+import os
+import signal
+import sys
+import threading
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing.connection import Client, Listener
+
+# ========================= KONFIGURASI DEFAULT =========================
+DEFAULT_MAX_CONCURRENCY = 2       # Video yang diproses model server secara bersamaan (sisanya menunggu)
+DEFAULT_TIMEOUT_SECONDS = 600     # Batas waktu menunggu pesan dari model server per panggilan
+UNTHROTTLED_OPS = ("status",)     # Operasi ringan yang tidak ikut dibatasi max_concurrency
+
+
+class ModelServerError(Exception):
+    """Dilempar client ketika model server tidak dapat dihubungi, timeout, atau handler gagal."""
+
+
+def parse_address(address):
+    """'host:port' -> (host, port) untuk TCP; selain itu path Unix socket / named pipe Windows."""
+    host, separator, port = address.rpartition(":")
+    if separator and port.isdigit() and not address.startswith("\\\\"):
+        return host or "127.0.0.1", int(port)
+    return address
+
+
+class ModelServer:
+    """
+    Server IPC: setiap koneksi dilayani satu thread dan dapat mengirim beberapa request berurutan.
+
+    Request berupa (op, args, kwargs); handler dipanggil sebagai handler(emit, *args, **kwargs),
+    di mana emit(payload) mengirim event ("event", payload) ke client sebelum hasil akhir
+    ("ok", hasil) atau ("error", pesan). Operasi di luar UNTHROTTLED_OPS dibatasi max_concurrency.
+    """
+
+    def __init__(self, address, authkey, handlers, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+        self.address = parse_address(address)
+        self.authkey = authkey or None
+        self.handlers = handlers
+        self._slots = threading.BoundedSemaphore(max(1, max_concurrency))
+        self._listener = None
+
+    def serve_forever(self):
+        if isinstance(self.address, str) and os.name != "nt" and os.path.exists(self.address):
+            os.unlink(self.address) # Socket sisa proses sebelumnya yang berhenti tidak normal
+        self._listener = Listener(self.address, authkey=self.authkey)
+        print(f"--- Model server mendengarkan di {self.address} ---")
+        while True:
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                if self._listener is None:
+                    return # close() dipanggil
+                traceback.print_exc()
+                continue
+            threading.Thread(target=self._serve_connection, args=(conn,), name="model-conn", daemon=True).start()
+
+    def close(self):
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.close()
+
+    # ------ INTERNAL ------
+    def _serve_connection(self, conn):
+        send_lock = threading.Lock() # Event bisa dikirim dari thread STT dan CV secara bersamaan
+
+        def send(message):
+            with send_lock:
+                conn.send(message)
+
+        with conn:
+            while True:
+                try:
+                    op, args, kwargs = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    reply = ("ok", self._dispatch(op, args, kwargs, lambda payload: send(("event", payload))))
+                except Exception as e:
+                    traceback.print_exc()
+                    reply = ("error", f"{type(e).__name__}: {e}")
+                try:
+                    send(reply)
+                except (EOFError, OSError):
+                    return # Client sudah memutus koneksi
+
+    def _dispatch(self, op, args, kwargs, emit):
+        handler = self.handlers.get(op)
+        if handler is None:
+            raise ValueError(f"Unknown model server operation '{op}'")
+        if op in UNTHROTTLED_OPS:
+            return handler(emit, *args, **kwargs)
+        with self._slots:
+            return handler(emit, *args, **kwargs)
+
+
+class ModelServerClient:
+    """Client untuk ModelServer; satu koneksi per panggilan sehingga aman dipakai dari banyak thread."""
+
+    def __init__(self, address, authkey, timeout=DEFAULT_TIMEOUT_SECONDS):
+        self.address = parse_address(address)
+        self.authkey = authkey or None
+        self.timeout = timeout
+
+    def call(self, op, *args, on_event=None, **kwargs):
+        """Menjalankan op di model server; on_event(payload) dipanggil untuk setiap event sebelum hasil."""
+        try:
+            conn = Client(self.address, authkey=self.authkey)
+        except OSError as e:
+            raise ModelServerError(f"Model server unreachable at {self.address}: {e}") from e
+
+        with conn:
+            try:
+                conn.send((op, args, kwargs))
+                while True:
+                    if not conn.poll(self.timeout):
+                        raise ModelServerError(f"Model server did not respond within {self.timeout}s ({op})")
+                    kind, payload = conn.recv()
+                    if kind == "event":
+                        if on_event is not None:
+                            on_event(payload)
+                    elif kind == "ok":
+                        return payload
+                    else:
+                        raise ModelServerError(payload)
+            except (EOFError, OSError) as e:
+                raise ModelServerError(f"Model server closed the connection ({op}): {e}") from e
+
+
+# ========================= HANDLER PIPELINE =========================
+def pipeline_handlers(pipeline):
+    """Handler untuk modul app: STT + CV satu video (termasuk ingest tunggal) dan status model."""
+
+    def stt_cv(emit, video_path, stream_transcript=False, cached_stt=None, cached_cv=None):
+        progress = lambda stage, status, detail=None: emit((stage, status, detail))
+        return pipeline.run_stt_and_cv_parallel(
+            video_path, progress, stream_transcript, cached_stt=cached_stt, cached_cv=cached_cv
+        )
+
+    def status(emit):
+        return pipeline.model_status()
+
+    return {"stt_cv": stt_cv, "status": status}
+
+
+def start_metrics_http(port, host="127.0.0.1"):
+    """Menyajikan /metrics proses model server (metrik disimpan per proses) di thread terpisah."""
+    from metrics import render_metrics
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = render_metrics().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="model-metrics", daemon=True).start()
+    print(f"--- Metrik model server: http://{host}:{server.server_address[1]}/metrics ---")
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--address", default=os.environ.get("MODEL_SERVER_ADDRESS"),
+                        help="Unix socket path atau host:port")
+    parser.add_argument("--max-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY,
+                        help="Video yang diproses bersamaan")
+    parser.add_argument("--metrics-port", type=int, default=0, help="Port HTTP /metrics (0 = nonaktif)")
+    args = parser.parse_args()
+    if not args.address:
+        parser.error("--address (or MODEL_SERVER_ADDRESS) is required")
+
+    # Proses ini yang menjalankan model: app tidak boleh meneruskan pipeline ke model server lagi
+    os.environ.pop("MODEL_SERVER_ADDRESS", None)
+    os.environ.setdefault("MODEL_WARMUP", "eager") # Socket baru dibuka setelah model siap
+    import app as pipeline
+
+    if args.metrics_port:
+        start_metrics_http(args.metrics_port)
+    server = ModelServer(args.address, os.environ.get("MODEL_SERVER_AUTHKEY", "").encode(),
+                         pipeline_handlers(pipeline), max_concurrency=args.max_concurrency)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0)) # finally menutup (dan menghapus) socket
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
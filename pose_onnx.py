@@ -0,0 +1,159 @@
+import ast
+
+import cv2
+import numpy as np
+
+# ========================= KONFIGURASI DEFAULT =========================
+DEFAULT_IMGSZ = 320        # Sisi input model (piksel); lebih kecil dari 640 bawaan ultralytics
+DEFAULT_CONF = 0.25        # Sama dengan conf default predict ultralytics
+LETTERBOX_COLOR = 114
+FACE_KP_IDS = (0, 1, 2, 3, 4) # Hidung, mata kanan/kiri, telinga kanan/kiri (urutan keypoint COCO)
+ROI_SCALE = 3.0            # Lebar area crop = ROI_SCALE x ukuran wajah (kepala + bahu)
+ROI_MIN_SIZE = 160         # Sisi minimum area crop (piksel frame asli)
+ROI_REDETECT_EVERY = 30    # Paksa deteksi full frame setiap N frame agar area tidak "tertinggal"
+
+PROVIDERS = {
+    "cpu": ["CPUExecutionProvider"],
+    "openvino": ["OpenVINOExecutionProvider", "CPUExecutionProvider"], # Memerlukan onnxruntime-openvino
+    "cuda": ["CUDAExecutionProvider", "CPUExecutionProvider"],
+}
+
+
+def letterbox(frame, imgsz):
+    """Resize dengan rasio tetap ke imgsz x imgsz, sisa area diisi abu-abu. Mengembalikan (gambar, skala, (pad_x, pad_y))."""
+    height, width = frame.shape[:2]
+    scale = min(imgsz / height, imgsz / width)
+    new_width, new_height = round(width * scale), round(height * scale)
+    if (new_width, new_height) != (width, height):
+        frame = cv2.resize(frame, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+    pad_x, pad_y = (imgsz - new_width) // 2, (imgsz - new_height) // 2
+    canvas = np.full((imgsz, imgsz, 3), LETTERBOX_COLOR, dtype=np.uint8)
+    canvas[pad_y:pad_y + new_height, pad_x:pad_x + new_width] = frame
+    return canvas, scale, (pad_x, pad_y)
+
+
+class FaceRegionTracker:
+    """
+    Area wajah kandidat dari deteksi sebelumnya (satu instance per video), dipakai untuk meng-crop
+    frame berikutnya sebelum inferensi: model melihat kepala + bahu dengan resolusi lebih tinggi
+    pada imgsz yang sama. Jika orang tidak terdeteksi di area crop, frame diulang secara full frame.
+    """
+
+    def __init__(self, scale=ROI_SCALE, min_size=ROI_MIN_SIZE, redetect_every=ROI_REDETECT_EVERY):
+        self.scale = scale
+        self.min_size = min_size
+        self.redetect_every = redetect_every
+        self.region = None # (x0, y0, x1, y1) dalam koordinat frame asli, None = full frame
+        self._frames_since_full = 0
+
+    def current_region(self):
+        if self.region is None or self._frames_since_full >= self.redetect_every:
+            return None
+        return self.region
+
+    def update(self, keypoints, frame_shape, used_full_frame, num_frames=1):
+        """keypoints: (K, 2) keypoint terakhir yang terdeteksi (baris NaN = tidak ada orang)."""
+        self._frames_since_full = 0 if used_full_frame else self._frames_since_full + num_frames
+        face = keypoints[list(FACE_KP_IDS)]
+        face = face[~np.isnan(face).any(axis=1) & (face != 0).any(axis=1)]
+        if len(face) < 2:
+            self.region = None
+            return
+
+        height, width = frame_shape[:2]
+        (x_min, y_min), (x_max, y_max) = face.min(axis=0), face.max(axis=0)
+        half = max(max(x_max - x_min, y_max - y_min) * self.scale, self.min_size) / 2
+        center_x, center_y = (x_min + x_max) / 2, (y_min + y_max) / 2
+        # Area diperluas ke bawah agar bahu ikut terlihat (model pose dilatih pada tubuh, bukan wajah saja)
+        x0, x1 = int(max(0, center_x - half)), int(min(width, center_x + half))
+        y0, y1 = int(max(0, center_y - half)), int(min(height, center_y + 1.5 * half))
+        self.region = (x0, y0, x1, y1) if x1 - x0 >= 32 and y1 - y0 >= 32 else None
+
+
+class OnnxPoseModel:
+    """
+    Model YOLO-Pose hasil ekspor ONNX (tools/export_pose_onnx.py) yang dijalankan dengan onnxruntime,
+    tanpa torch/ultralytics. infer_keypoints() menghasilkan array (N, K, 2) yang sama dengan
+    cv_detector.infer_keypoints_batch: keypoint orang dengan confidence tertinggi per frame
+    (setara hasil pertama setelah NMS di ultralytics), dalam koordinat frame asli; baris NaN jika
+    tidak ada orang terdeteksi.
+    """
+
+    def __init__(self, path, imgsz=DEFAULT_IMGSZ, conf=DEFAULT_CONF, provider="cpu", intra_op_threads=0):
+        import onnxruntime as ort
+
+        session_options = ort.SessionOptions()
+        if intra_op_threads > 0:
+            session_options.intra_op_num_threads = intra_op_threads
+        available = ort.get_available_providers()
+        providers = [name for name in PROVIDERS.get(provider, PROVIDERS["cpu"]) if name in available]
+        self.session = ort.InferenceSession(path, sess_options=session_options, providers=providers or None)
+        self.provider = self.session.get_providers()[0]
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        # Model yang diekspor tanpa dynamic=True memiliki batch dan ukuran input tetap
+        self.fixed_batch = model_input.shape[0] if isinstance(model_input.shape[0], int) else None
+        self.imgsz = model_input.shape[2] if isinstance(model_input.shape[2], int) else imgsz
+        self.conf = conf
+
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.num_keypoints, self.keypoint_dims = ast.literal_eval(metadata.get("kpt_shape", "[17, 3]"))
+
+    def infer_keypoints(self, frames, tracker=None):
+        region = tracker.current_region() if tracker is not None else None
+        keypoints = self._infer(frames, region)
+
+        if region is not None:
+            # Orang tidak terdeteksi di area crop: ulangi frame tersebut secara full frame
+            missed = [i for i in range(len(frames)) if np.isnan(keypoints[i, 0, 0])]
+            if missed:
+                keypoints[missed] = self._infer([frames[i] for i in missed], None)
+
+        if tracker is not None:
+            detected = [i for i in range(len(frames)) if not np.isnan(keypoints[i, 0, 0])]
+            last = keypoints[detected[-1]] if detected else keypoints[-1]
+            tracker.update(last, frames[-1].shape, used_full_frame=region is None, num_frames=len(frames))
+        return keypoints
+
+    # ------ INTERNAL ------
+    def _infer(self, frames, region):
+        offset_x, offset_y = (region[0], region[1]) if region is not None else (0, 0)
+        inputs, transforms = [], []
+        for frame in frames:
+            if region is not None:
+                frame = frame[region[1]:region[3], region[0]:region[2]]
+            image, scale, pad = letterbox(frame, self.imgsz)
+            inputs.append(image)
+            transforms.append((scale, pad))
+        # BGR HWC uint8 -> RGB NCHW float32 [0, 1]
+        batch = np.ascontiguousarray(np.stack(inputs)[..., ::-1].transpose(0, 3, 1, 2), dtype=np.float32) / 255.0
+
+        if self.fixed_batch:
+            # Model diekspor dengan batch statis: chunk terakhir dipad frame nol, output pad dibuang
+            chunks = []
+            for i in range(0, len(batch), self.fixed_batch):
+                chunk = batch[i:i + self.fixed_batch]
+                padded = chunk
+                if len(chunk) < self.fixed_batch:
+                    padded = np.zeros((self.fixed_batch, *chunk.shape[1:]), dtype=chunk.dtype)
+                    padded[:len(chunk)] = chunk
+                chunks.append(self.session.run(None, {self.input_name: padded})[0][:len(chunk)])
+            outputs = np.concatenate(chunks)
+        else:
+            outputs = self.session.run(None, {self.input_name: batch})[0]
+
+        # Output (N, 4 + num_classes + K * D, anchors): box cxcywh, skor kelas, keypoint (x, y, visibilitas)
+        keypoint_start = outputs.shape[1] - self.num_keypoints * self.keypoint_dims
+        scores = outputs[:, 4:keypoint_start, :].max(axis=1)
+        best = scores.argmax(axis=1)
+
+        keypoints = np.full((len(frames), self.num_keypoints, 2), np.nan, dtype=np.float32)
+        for i, anchor in enumerate(best):
+            if scores[i, anchor] < self.conf:
+                continue
+            raw = outputs[i, keypoint_start:, anchor].reshape(self.num_keypoints, self.keypoint_dims)[:, :2]
+            scale, (pad_x, pad_y) = transforms[i]
+            keypoints[i, :, 0] = (raw[:, 0] - pad_x) / scale + offset_x
+            keypoints[i, :, 1] = (raw[:, 1] - pad_y) / scale + offset_y
+        return keypoints
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# ========================= KONFIGURASI DEFAULT =========================
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600  # Hasil disimpan 7 hari
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def file_sha256(path):
+    """Hash SHA-256 isi file (dibaca per blok agar tidak memuat seluruh video ke memori)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(HASH_CHUNK_BYTES)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Cache hasil berbasis SQLite (bertahan setelah restart) dengan namespace terpisah,
+    mis. "stt", "cv" dan "llm". Entri kedaluwarsa setelah ttl_seconds dan entri yang paling
+    lama tidak diakses dibuang (LRU) jika jumlah entri/ukuran total melewati batas.
+    """
+
+    def __init__(self, path, ttl_seconds=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES,
+                 max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS results (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_accessed ON results (accessed_at)")
+        self._conn.commit()
+
+    def get(self, namespace, key):
+        """Mengembalikan nilai tersimpan, atau None jika tidak ada / sudah kedaluwarsa."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM results WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM results WHERE namespace = ? AND key = ?", (namespace, key))
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE results SET accessed_at = ? WHERE namespace = ? AND key = ?", (now, namespace, key)
+            )
+            self._conn.commit()
+        return json.loads(value)
+
+    def set(self, namespace, key, value):
+        """Menyimpan nilai (harus dapat di-serialisasi JSON), lalu menjalankan eviction."""
+        payload = json.dumps(value)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (namespace, key, value, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (namespace, key, payload, len(payload), now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def clear(self, namespace=None):
+        with self._lock:
+            if namespace is None:
+                self._conn.execute("DELETE FROM results")
+            else:
+                self._conn.execute("DELETE FROM results WHERE namespace = ?", (namespace,))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ----------------------------- INTERNAL -----------------------------
+    def _evict(self, now):
+        # Dipanggil dengan lock sudah dipegang
+        self._conn.execute("DELETE FROM results WHERE created_at < ?", (now - self.ttl_seconds,))
+
+        count, total_bytes = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        if count <= self.max_entries and total_bytes <= self.max_bytes:
+            return
+
+        # Buang entri yang paling lama tidak diakses hingga kembali di bawah batas
+        rows = self._conn.execute("SELECT namespace, key, size FROM results ORDER BY accessed_at ASC").fetchall()
+        for namespace, key, size in rows:
+            if count <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM results WHERE namespace = ? AND key = ?", (namespace, key))
+            count -= 1
+            total_bytes -= size
@@ -0,0 +1,144 @@
+"""
+Entry point produksi: satu model server + beberapa worker web (gunicorn) per host.
+
+- Model server (model_server.py) memuat Whisper dan YOLO-Pose satu kali per host dan menjalankan
+  STT + CV untuk semua worker. Tidak memakai preload + fork: sesi ONNX Runtime / PyTorch beserta
+  thread pool-nya tidak aman di-fork, dan refcount Python membuat halaman memori model tetap tersalin.
+- Worker web (gunicorn gthread) hanya menangani HTTP, upload, cache, LLM dan sesi; tidak memuat model.
+- Thread CPU dibagi: inferensi mendapat hampir seluruh core (dibagi per video yang diproses bersamaan
+  dan per model, karena STT dan CV berjalan paralel), worker web memakai 1 thread ONNX/BLAS.
+- Status job disalin ke SQLite (JOB_RECORDS=sqlite) agar polling /api/jobs/<id> berhasil di worker mana pun.
+  Metrik /metrics tetap per proses (lihat --model-metrics-port untuk metrik model server).
+
+gunicorn tidak tersedia di Windows; di sana worker web dijalankan dengan server Flask (satu proses, threaded).
+
+Contoh:
+    python serve.py --bind 0.0.0.0:5000 --workers 4 --threads 8 --model-concurrency 2
+"""
+import argparse
+import os
+import secrets
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def default_model_address():
+    if os.name == "nt":
+        return "127.0.0.1:6001"
+    return os.path.join(tempfile.gettempdir(), f"assessment-model-{os.getpid()}.sock")
+
+
+def split_thread_budget(cpu_count, model_concurrency):
+    """Thread intra-op per model: core dibagi untuk setiap video yang berjalan bersamaan x (STT, CV)."""
+    return max(1, cpu_count // (2 * max(1, model_concurrency)))
+
+
+def thread_env(threads):
+    value = str(threads)
+    return {"ORT_INTRA_OP_THREADS": value, "OMP_NUM_THREADS": value, "MKL_NUM_THREADS": value}
+
+
+def has_gunicorn():
+    if os.name == "nt":
+        return False
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def build_commands(args, model_threads):
+    """Mengembalikan [(nama, argv, env)] untuk model server dan worker web."""
+    base_env = {key: value for key, value in os.environ.items() if key != "MODEL_SERVER_ADDRESS"}
+    base_env["MODEL_SERVER_AUTHKEY"] = os.environ.get("MODEL_SERVER_AUTHKEY") or secrets.token_hex(16)
+
+    model_env = dict(base_env, **thread_env(model_threads))
+    model_env.setdefault("MEDIA_WORKERS", str(max(2, args.model_concurrency)))
+    model_command = [
+        sys.executable, os.path.join(REPO_ROOT, "model_server.py"), "--address", args.model_address,
+        "--max-concurrency", str(args.model_concurrency), "--metrics-port", str(args.model_metrics_port),
+    ]
+
+    web_env = dict(base_env, **thread_env(1))
+    web_env.update({
+        "MODEL_SERVER_ADDRESS": args.model_address,
+        "MODEL_WARMUP": "0",
+        "JOB_RECORDS": os.environ.get("JOB_RECORDS", "sqlite"),
+        "MEDIA_WORKERS": "2",
+    })
+    if has_gunicorn():
+        web_command = [
+            sys.executable, "-m", "gunicorn", "app:app",
+            "--bind", args.bind,
+            "--workers", str(args.workers),
+            "--threads", str(args.threads),
+            "--worker-class", "gthread",
+            "--timeout", str(args.timeout), # Request sinkron menunggu seluruh pipeline
+        ]
+    else:
+        print("PERINGATAN: gunicorn tidak tersedia (Windows?), worker web dijalankan dengan server Flask (1 proses).")
+        host, _, port = args.bind.rpartition(":")
+        web_command = [
+            sys.executable, "-c",
+            f"from app import app; app.run(host={host or '0.0.0.0'!r}, port={int(port)}, threaded=True)",
+        ]
+    return [("model-server", model_command, model_env), ("web", web_command, web_env)]
+
+
+def main():
+    cpu_count = os.cpu_count() or 2
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bind", default="0.0.0.0:5000")
+    parser.add_argument("--workers", type=int, default=min(4, cpu_count), help="Jumlah proses worker web")
+    parser.add_argument("--threads", type=int, default=8, help="Thread per worker web (request bersamaan)")
+    parser.add_argument("--timeout", type=int, default=600, help="Timeout request worker gunicorn (detik)")
+    parser.add_argument("--model-address", default=os.environ.get("MODEL_SERVER_ADDRESS") or default_model_address(),
+                        help="Unix socket path atau host:port model server")
+    parser.add_argument("--model-concurrency", type=int, default=2, help="Video yang diproses model server bersamaan")
+    parser.add_argument("--model-threads", type=int, default=None,
+                        help="Thread intra-op per model (default: core CPU / (2 x --model-concurrency))")
+    parser.add_argument("--model-metrics-port", type=int, default=0, help="Port /metrics model server (0 = nonaktif)")
+    args = parser.parse_args()
+
+    model_threads = args.model_threads or split_thread_budget(cpu_count, args.model_concurrency)
+    print(f"--- {cpu_count} core: model server {args.model_concurrency} video x 2 model x {model_threads} thread, "
+          f"{args.workers} worker web x {args.threads} thread ---")
+
+    processes = []
+
+    def shutdown(signum=None, frame=None):
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, shutdown)
+    try:
+        for name, command, env in build_commands(args, model_threads):
+            processes.append((name, subprocess.Popen(command, cwd=REPO_ROOT, env=env)))
+        # Jika salah satu proses berhenti, hentikan semuanya (supervisor/orchestrator yang me-restart)
+        while True:
+            for name, process in processes:
+                if process.poll() is not None:
+                    print(f"--- Proses {name} berhenti (exit code {process.returncode}) ---")
+                    return process.returncode or 1
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for _, process in processes:
+            if process.poll() is None:
+                process.terminate()
+        for _, process in processes:
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
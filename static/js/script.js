@@ -254,7 +254,7 @@ function renderScoreHistory(scores, questions) {
                 
                 <div class="flex text-sm text-gray-500 justify-between mt-3 pt-2 border-t">
                     <span>STT Acc: ${stt}%</span>
-                    <span>Non-Verbal Ratio: ${cv.eye_movement_ratio.toFixed(2)}</span>
+                    <span>Non-Verbal Ratio: ${cv.eye_movement_ratio.toFixed(2)}${cv.eye_movement_ratio_partial ? " (partial scan)" : ""}</span>
                     <span class="${cv.cheating_flag ? "text-red-600 font-semibold" : ""}">Violations: ${cv.violations}</span>
                 </div>
                 <div class="mt-3">
@@ -0,0 +1,91 @@
+"""
+Ekspor model YOLO-Pose (ultralytics .pt) ke ONNX untuk CV_POSE_BACKEND=onnx.
+
+Model diekspor dengan batch dan ukuran input dinamis (dynamic=True) sehingga CV_BATCH_SIZE dan
+CV_POSE_IMGSZ dapat diubah tanpa ekspor ulang (model batch statis tetap dapat dipakai: OnnxPoseModel
+memecah input per ukuran batch dan mem-pad chunk terakhir). Urutan keypoint (COCO 17 titik) tidak berubah, jadi
+aturan gaze di cv_detector tetap berlaku. Model yang sama dijalankan di OpenVINO lewat
+onnxruntime-openvino (CV_POSE_PROVIDER=openvino), tanpa format IR terpisah.
+
+--verify-video membandingkan keypoint ultralytics (.pt) dan onnxruntime (.onnx) pada beberapa frame
+video, untuk memastikan hasil ekspor setara sebelum dipakai.
+
+Contoh:
+    python tools/export_pose_onnx.py --model computer_vision_model/yolo11n-pose.pt \\
+        --output computer_vision_model/yolo11n-pose.onnx --verify-video sample.mp4
+    CV_POSE_BACKEND=onnx python app.py
+"""
+import argparse
+import os
+import shutil
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from pose_onnx import DEFAULT_IMGSZ  # noqa: E402
+
+
+def export_onnx(model_path, output_path, imgsz):
+    from ultralytics import YOLO
+
+    exported = YOLO(model_path).export(format="onnx", imgsz=imgsz, dynamic=True, simplify=False)
+    if os.path.abspath(exported) != os.path.abspath(output_path):
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        shutil.move(exported, output_path)
+
+
+def verify(model_path, onnx_path, video_path, imgsz, num_frames=16, conf=0.25):
+    """Selisih keypoint (piksel) antara backend ultralytics dan onnx pada frame awal video."""
+    import cv2
+    import numpy as np
+    from ultralytics import YOLO
+
+    from pose_onnx import OnnxPoseModel
+
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    while len(frames) < num_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    if not frames:
+        raise RuntimeError(f"Cannot read frames from {video_path}")
+
+    reference = np.full((len(frames), 17, 2), np.nan, dtype=np.float32)
+    for i, r in enumerate(YOLO(model_path)(frames, imgsz=imgsz, conf=conf, verbose=False)):
+        if r.keypoints is not None and len(r.keypoints.xy):
+            reference[i] = r.keypoints.xy[0].cpu().numpy()
+    exported = OnnxPoseModel(onnx_path, imgsz=imgsz, conf=conf).infer_keypoints(frames)
+
+    same_detection = np.isnan(reference[:, 0, 0]) == np.isnan(exported[:, 0, 0])
+    both = ~np.isnan(reference[:, 0, 0]) & ~np.isnan(exported[:, 0, 0])
+    deviation = np.abs(reference[both] - exported[both])
+    return {
+        "frames": len(frames),
+        "detection_agreement": float(same_detection.mean()),
+        "max_pixel_error": float(deviation.max()) if deviation.size else None,
+        "mean_pixel_error": float(deviation.mean()) if deviation.size else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="computer_vision_model/yolo11n-pose.pt", help="Model YOLO-Pose PyTorch")
+    parser.add_argument("--output", default="computer_vision_model/yolo11n-pose.onnx", help="Path output ONNX")
+    parser.add_argument("--imgsz", type=int, default=DEFAULT_IMGSZ, help="Ukuran input default saat ekspor")
+    parser.add_argument("--verify-video", help="Video untuk membandingkan keypoint .pt vs .onnx")
+    parser.add_argument("--skip-export", action="store_true", help="Hanya verifikasi --output yang sudah ada")
+    args = parser.parse_args()
+
+    if not args.skip_export:
+        export_onnx(args.model, args.output, args.imgsz)
+        print(f"--- Ekspor ONNX selesai: {args.output} ---")
+    if args.verify_video:
+        print(f"--- Verifikasi: {verify(args.model, args.output, args.verify_video, args.imgsz)} ---")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Ekspor model Whisper (PyTorch) ke ONNX dengan KV-cache, opsional dengan varian INT8.
+
+Menghasilkan encoder_model.onnx, decoder_model.onnx, decoder_with_past_model.onnx dan
+decoder_model_merged.onnx sehingga semua WHISPER_VARIANT (no-cache / with-past / merged) dapat dipilih.
+--quantize-to menulis salinan hasil kuantisasi dinamis INT8 (nama file sama) untuk WHISPER_QUANTIZED=1.
+
+Contoh:
+    python tools/export_whisper_onnx.py --model ./whisper-small-en-merged --output ./whisper-small-en-onnx \\
+        --quantize-to ./whisper-small-en-onnx-int8
+"""
+import argparse
+import os
+import shutil
+
+
+def export_onnx(model_dir, output_dir):
+    from optimum.exporters.onnx import main_export
+
+    main_export(
+        model_dir,
+        output=output_dir,
+        task="automatic-speech-recognition-with-past",
+        no_post_process=True, # Simpan decoder terpisah (no-cache / with-past)
+    )
+    # Decoder gabungan dibuat terpisah agar file decoder_model/decoder_with_past tetap tersedia
+    from optimum.onnx import merge_decoders
+
+    merge_decoders(
+        decoder=os.path.join(output_dir, "decoder_model.onnx"),
+        decoder_with_past=os.path.join(output_dir, "decoder_with_past_model.onnx"),
+        save_path=os.path.join(output_dir, "decoder_model_merged.onnx"),
+        strict=False,
+    )
+
+
+def quantize_int8(source_dir, target_dir):
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    os.makedirs(target_dir, exist_ok=True)
+    for file_name in sorted(os.listdir(source_dir)):
+        source = os.path.join(source_dir, file_name)
+        target = os.path.join(target_dir, file_name)
+        if file_name.endswith(".onnx"):
+            print(f"Quantizing {file_name} (INT8 dynamic)...")
+            quantize_dynamic(source, target, weight_type=QuantType.QInt8)
+        elif os.path.isfile(source) and not file_name.endswith(".onnx_data"):
+            shutil.copy2(source, target) # config.json, generation_config.json, dll.
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="./whisper-small-en-merged", help="Direktori model Whisper PyTorch")
+    parser.add_argument("--output", default="./whisper-small-en-onnx", help="Direktori output ONNX (FP32)")
+    parser.add_argument("--quantize-to", help="Direktori output varian INT8 (opsional)")
+    parser.add_argument("--skip-export", action="store_true", help="Hanya kuantisasi dari --output yang sudah ada")
+    args = parser.parse_args()
+
+    if not args.skip_export:
+        export_onnx(args.model, args.output)
+        print(f"--- Ekspor ONNX selesai: {args.output} ---")
+    if args.quantize_to:
+        quantize_int8(args.output, args.quantize_to)
+        print(f"--- Kuantisasi INT8 selesai: {args.quantize_to} ---")
+
+
+if __name__ == "__main__":
+    main()
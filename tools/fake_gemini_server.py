@@ -0,0 +1,102 @@
+"""
+Server Gemini palsu (lokal) untuk menguji penilaian LLM tanpa API key dan tanpa biaya.
+
+Menjawab POST .../models/<model>:generateContent dengan format respons Gemini. Skor ditentukan
+dari panjang transkrip (deterministik), dan untuk prompt batch (baris "## ID <n>") dikembalikan
+satu hasil per ID. Latensi dan error sementara (HTTP 503/429) dapat disimulasikan untuk menguji
+timeout, retry dan circuit breaker.
+
+Contoh:
+    python tools/fake_gemini_server.py --port 8765 --latency 0.5 --error-rate 0.2
+    GEMINI_API_KEY=fake GEMINI_BASE_URL=http://127.0.0.1:8765 python app.py
+"""
+import argparse
+import json
+import random
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TRANSCRIPT_PATTERN = re.compile(r'Candidate Transcript \(STT Output\):\s*"(.*?)"', re.S)
+BATCH_ID_PATTERN = re.compile(r"## ID (\d+)")
+
+
+def score_transcript(transcript):
+    """Skor palsu 0-4: semakin panjang jawaban, semakin tinggi skor."""
+    return min(4, len(transcript.split()) // 25)
+
+
+def build_scores(prompt):
+    transcripts = TRANSCRIPT_PATTERN.findall(prompt)
+    batch_ids = [int(i) for i in BATCH_ID_PATTERN.findall(prompt)]
+    if batch_ids:
+        return {"results": [
+            {"id": question_id, "score": score_transcript(transcript), "reason": f"Fake batch score for Q{question_id}."}
+            for question_id, transcript in zip(batch_ids, transcripts)
+        ]}
+    transcript = transcripts[0] if transcripts else ""
+    return {"score": score_transcript(transcript), "reason": "Fake score from local test server."}
+
+
+def make_handler(latency, error_rate, error_code):
+    class FakeGeminiHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1" # Keep-alive, sama seperti API asli
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+
+            if latency:
+                time.sleep(latency)
+            if not self.path.endswith(":generateContent"):
+                return self._send(404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}})
+            if random.random() < error_rate:
+                return self._send(error_code, {"error": {"code": error_code, "message": "Simulated failure", "status": "UNAVAILABLE"}})
+
+            prompt = "".join(
+                part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", [])
+            )
+            text = json.dumps(build_scores(prompt))
+            self._send(200, {
+                "candidates": [{"content": {"role": "model", "parts": [{"text": text}]}, "finishReason": "STOP"}],
+                "usageMetadata": {"promptTokenCount": len(prompt.split()), "candidatesTokenCount": len(text.split())},
+            })
+
+        def _send(self, status, payload):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            try:
+                self.wfile.write(data)
+            except (BrokenPipeError, ConnectionResetError):
+                pass # Client sudah menyerah (timeout) sebelum respons dikirim
+
+        def log_message(self, format, *args):
+            pass # Jangan memenuhi terminal dengan log per request
+
+    return FakeGeminiHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Jeda per request (detik)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Peluang request gagal (0-1)")
+    parser.add_argument("--error-code", type=int, default=503, help="Kode HTTP untuk kegagalan simulasi")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.latency, args.error_rate, args.error_code))
+    print(f"--- Fake Gemini server berjalan di http://{args.host}:{args.port} ---")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
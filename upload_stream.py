@@ -0,0 +1,69 @@
+import hashlib
+import os
+import tempfile
+
+from flask import Request, current_app
+from werkzeug.utils import secure_filename
+
+
+class HashingUploadFile:
+    """
+    Tujuan tulis untuk satu file upload: data langsung ditulis ke file bernama unik di folder upload
+    sambil dihitung hash SHA-256-nya, sehingga file tidak perlu disalin (file.save) atau dibaca ulang
+    untuk cache hasil. File dihapus saat request selesai kecuali sudah diambil alih lewat claim().
+    """
+
+    def __init__(self, directory, suffix=""):
+        fd, self.path = tempfile.mkstemp(prefix="upload_", suffix=suffix, dir=directory)
+        self._file = os.fdopen(fd, "w+b")
+        self._sha256 = hashlib.sha256()
+        self.size = 0
+        self.claimed = False
+
+    def write(self, data):
+        self._sha256.update(data)
+        self.size += len(data)
+        return self._file.write(data)
+
+    def hexdigest(self):
+        return self._sha256.hexdigest()
+
+    def claim(self):
+        """Menutup file dan mengalihkan tanggung jawab penghapusan ke pemanggil. Mengembalikan path."""
+        self._file.close()
+        self.claimed = True
+        return self.path
+
+    def discard(self):
+        """Menutup dan menghapus file (dipanggil untuk upload yang tidak pernah diproses)."""
+        self._file.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __getattr__(self, name):
+        # read/readline/seek/tell/flush/close diteruskan ke file asli (dibutuhkan FileStorage)
+        return getattr(self._file, name)
+
+
+class StreamingUploadRequest(Request):
+    """
+    Request Flask yang menulis setiap file upload langsung ke HashingUploadFile saat body diterima,
+    menggantikan SpooledTemporaryFile bawaan Werkzeug (yang kemudian masih harus disalin oleh file.save).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.upload_files = []
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        directory = current_app.config.get("UPLOAD_FOLDER") or tempfile.gettempdir()
+        suffix = os.path.splitext(secure_filename(filename or ""))[1]
+        upload = HashingUploadFile(directory, suffix=suffix)
+        self.upload_files.append(upload)
+        return upload
+
+    def discard_unclaimed_uploads(self):
+        """Menghapus file upload yang tidak diambil alih (validasi gagal, error, upload terputus, dll.)."""
+        for upload in self.upload_files:
+            if not upload.claimed:
+                upload.discard()